@@ -1,5 +1,7 @@
 import streamlit as st
 
+from banktech.theme import apply_theme
+
 # Set page configuration
 st.set_page_config(
     page_title="BankTech AI Suite",
@@ -8,142 +10,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Add custom CSS
-st.markdown("""
-<style>
-    a {
-        text-decoration: none !important;
-    }
-    .main-header {
-        font-size: 3.2rem;
-        font-weight: 700;
-        color: #0A2559;
-        margin-bottom: 1rem;
-        display: flex;
-        justify-content: center;
-    }
-    
-    .tagline {
-        font-size: 1.5rem;
-        color: #4A5568;
-        margin-bottom: 2.5rem;
-        font-weight: 300;
-    }
-    
-    .section-header {
-        font-size: 2rem;
-        font-weight: 600;
-        color: #0A2559;
-        margin-top: 2rem;
-        margin-bottom: 1.5rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #E2E8F0;
-    }
-    
-    .feature-box {
-        background-color: #F8FAFC;
-        border-radius: 8px;
-        padding: 1.5rem;
-        height: 100%;
-        border-left: 4px solid #0A2559;
-        transition: transform 0.3s;
-    }
-    
-    .feature-box:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1);
-    }
-    
-    .feature-icon {
-        font-size: 2rem;
-        margin-bottom: 1rem;
-        color: #0A2559;
-    }
-    
-    .feature-title {
-        font-size: 1.3rem;
-        font-weight: 600;
-        color: #0A2559;
-        margin-bottom: 0.75rem;
-    }
-    
-    .feature-desc {
-        color: #4A5568;
-        font-size: 1rem;
-        line-height: 1.5;
-    }
-    
-    .cta-section {
-        background-color: #E6EFF6;
-        padding: 2.5rem;
-        border-radius: 8px;
-        margin: 3rem 0;
-        text-align: center;
-    }
-    
-    .cta-title {
-        font-size: 1.8rem;
-        font-weight: 600;
-        color: #0A2559;
-        margin-bottom: 1rem;
-    }
-    
-    .cta-text {
-        color: #4A5568;
-        font-size: 1.1rem;
-        margin-bottom: 1.5rem;
-        max-width: 800px;
-        margin-left: auto;
-        margin-right: auto;
-    }
-    
-    .stats-box {
-        background-color: #F8FAFC;
-        border-radius: 8px;
-        padding: 1.5rem;
-        text-align: center;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-    }
-    
-    .stats-number {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #0A2559;
-        margin-bottom: 0.5rem;
-    }
-    
-    .stats-label {
-        color: #4A5568;
-        font-size: 1rem;
-    }
-    
-    .footer {
-        text-align: center;
-        color: #718096;
-        padding-top: 2rem;
-        font-size: 0.9rem;
-    }
-    
-    .dashboard-button {
-        background-color: #0A2559;
-        color: white;
-        border-radius: 4px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        font-size: 1.1rem;
-        border: none;
-        cursor: pointer;
-        text-align: center;
-        text-decoration: none;
-        display: inline-block;
-        transition: background-color 0.3s;
-    }
-    
-    .dashboard-button:hover {
-        background-color: #183C7E;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet, cached by the browser
+apply_theme()
 
 def main():
     # Hero Section
@@ -197,7 +65,7 @@ def main():
     
     with col1:
         st.markdown('''
-        <a href="Transactions" target="_self">
+        <a class="nav-link" href="Transactions" target="_self">
             <div class="feature-box">
                 <div class="feature-icon">📊</div>
                 <div class="feature-title">Automated Report Generation</div>
@@ -210,7 +78,7 @@ def main():
     
     with col2:
         st.markdown('''
-        <a href="Credit_Risk_Analysis" target="_self">
+        <a class="nav-link" href="Credit_Risk_Analysis" target="_self">
             <div class="feature-box">
                 <div class="feature-icon">🧮</div>
                 <div class="feature-title">Credit Risk Analysis</div>
@@ -226,7 +94,7 @@ def main():
     
     with col1:
         st.markdown('''
-        <a href="Bulk_Processing" target="_self">
+        <a class="nav-link" href="Bulk_Processing" target="_self">
             <div class="feature-box">
                 <div class="feature-icon">💸</div>
                 <div class="feature-title">Bulk Payment Processing</div>
@@ -239,7 +107,7 @@ def main():
         
     with col2:
         st.markdown('''
-        <a href="Account_Reconciliation" target="_self">
+        <a class="nav-link" href="Account_Reconciliation" target="_self">
             <div class="feature-box">
                 <div class="feature-icon">📑</div>
                 <div class="feature-title">Automated Account Reconciliation</div>
@@ -257,7 +125,7 @@ def main():
         <div class="cta-text">
             BankTech AI Suite brings cutting-edge artificial intelligence and process automation to modernize your financial institution. Our platform seamlessly integrates with your existing systems to deliver immediate efficiency gains while setting the foundation for future innovation.
         </div>
-        <a href="Dashboard" target="_self">
+        <a class="nav-link" href="Dashboard" target="_self">
             <button class="dashboard-button">Explore Dashboard</button>
         </a>
     </div>
@@ -0,0 +1 @@
+"""Shared building blocks for the BankTech AI Suite pages."""
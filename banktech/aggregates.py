@@ -0,0 +1,168 @@
+"""
+Per-customer transaction aggregates.
+
+Built once per dataset, they hold everything an AI report and its charts
+need, so a report never rescans the raw transactions.
+"""
+import numpy as np
+import pandas as pd
+
+def _rows_for(keys, customer_ids):
+    """Return the positions of the rows of ``customer_ids`` in sorted ``keys``"""
+    starts = np.searchsorted(keys, customer_ids, side="left")
+    lengths = np.searchsorted(keys, customer_ids, side="right") - starts
+    # Concatenate the ranges start:start + length without a Python loop
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+class CustomerAggregates:
+    """
+    Report statistics per customer.
+
+    ``by_type`` holds the transaction count and the amount count, sum and
+    max per Customer_ID and Transaction_Type, from a single groupby pass.
+    ``locations`` counts transactions per Customer_ID and
+    Transaction_Location, and ``daily`` sums amounts per Customer_ID and
+    Transaction_Date, for the charts.
+    """
+
+    def __init__(self, df=None, by_type=None, locations=None, daily=None):
+        if df is not None:
+            by_type = (df.groupby(["Customer_ID", "Transaction_Type"], dropna=False, observed=True)
+                       ["Transaction_Amount"].agg(["size", "count", "sum", "max"]))
+            locations = df.groupby(["Customer_ID", "Transaction_Location"], observed=True).size()
+            daily = df.groupby(["Customer_ID", "Transaction_Date"], observed=True)["Transaction_Amount"].sum()
+        self.by_type = by_type
+        self.locations = locations
+        self.daily = daily
+
+    @property
+    def row_count(self):
+        """Number of transactions aggregated"""
+        return int(self.by_type["size"].sum())
+
+    def for_customers(self, customer_ids):
+        """Return the aggregates of the given customers only"""
+        customer_ids = np.unique(np.asarray(customer_ids))
+        tables = {}
+        for name in ("by_type", "locations", "daily"):
+            table = getattr(self, name)
+            # Groupby output is sorted by Customer_ID, the first index level
+            keys = table.index.get_level_values(0).to_numpy()
+            tables[name] = table.iloc[_rows_for(keys, customer_ids)]
+        return CustomerAggregates(**tables)
+
+    def type_counts(self):
+        """Transactions per Transaction_Type, most frequent first"""
+        counts = self.by_type["size"].groupby(level="Transaction_Type", observed=True).sum()
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def location_counts(self):
+        """Transactions per Transaction_Location, most frequent first"""
+        counts = self.locations.groupby(level="Transaction_Location", observed=True).sum()
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def daily_amounts(self):
+        """Total Transaction_Amount per Transaction_Date, in date order"""
+        return self.daily.groupby(level="Transaction_Date", observed=True).sum()
+
+    def stats(self):
+        """Return the transaction statistics a report is written from"""
+        totals = self.by_type.groupby(level="Transaction_Type", dropna=False, observed=True).agg(
+            {"size": "sum", "count": "sum", "sum": "sum", "max": "max"}
+        )
+
+        def of_type(transaction_type, column):
+            return totals[column].get(transaction_type, 0)
+
+        amount_count = int(totals["count"].sum())
+        total_amount = float(totals["sum"].sum())
+        credit_sum = float(of_type("Credit", "sum"))
+        debit_sum = float(of_type("Debit", "sum"))
+        return {
+            "total_transactions": int(totals["size"].sum()),
+            "total_amount": total_amount,
+            "avg_amount": total_amount / amount_count if amount_count else float("nan"),
+            "max_transaction": float(totals["max"].max()),
+            "credit_count": int(of_type("Credit", "size")),
+            "debit_count": int(of_type("Debit", "size")),
+            "credit_sum": credit_sum,
+            "debit_sum": debit_sum,
+            "net_balance": credit_sum - debit_sum,
+            "locations": {str(k): int(v) for k, v in self.location_counts().items()},
+        }
+
+    def stats_by_customer(self):
+        """Return ``{Customer_ID: stats}`` for every customer, computed together"""
+        totals = self.by_type.groupby(level="Customer_ID").agg({"size": "sum", "count": "sum", "max": "max"})
+        type_values = self.by_type.index.get_level_values("Transaction_Type")
+
+        def of_type(transaction_type, column):
+            if pd.isna(transaction_type):
+                of_this_type = type_values.isna()
+            else:
+                of_this_type = type_values == transaction_type
+            typed = self.by_type[column][of_this_type].droplevel("Transaction_Type")
+            return typed.reindex(totals.index, fill_value=0)
+
+        # Add the types up in the order stats() does, so both give identical floats
+        total_amount = pd.Series(0.0, index=totals.index)
+        for transaction_type in self.by_type.groupby(level="Transaction_Type", dropna=False, observed=True).size().index:
+            total_amount = total_amount + of_type(transaction_type, "sum")
+
+        credit_sum, debit_sum = of_type("Credit", "sum"), of_type("Debit", "sum")
+        table = pd.DataFrame({
+            "total_transactions": totals["size"],
+            "total_amount": total_amount,
+            "avg_amount": total_amount / totals["count"].where(totals["count"] > 0),
+            "max_transaction": totals["max"],
+            "credit_count": of_type("Credit", "size"),
+            "debit_count": of_type("Debit", "size"),
+            "credit_sum": credit_sum,
+            "debit_sum": debit_sum,
+            "net_balance": credit_sum - debit_sum,
+        })
+
+        # Most frequent location first within each customer, as in location_counts()
+        locations = self.locations[self.locations > 0].reset_index(name="count")
+        locations = locations.sort_values(["Customer_ID", "count"], ascending=[True, False], kind="stable")
+        locations_by_customer = {}
+        for customer_id, location, count in zip(locations["Customer_ID"].tolist(),
+                                                locations["Transaction_Location"].astype(str).tolist(),
+                                                locations["count"].tolist()):
+            locations_by_customer.setdefault(customer_id, {})[location] = count
+
+        int_columns = {"total_transactions", "credit_count", "debit_count"}
+        stats = {}
+        for customer_id, row in zip(table.index.tolist(), table.to_dict("records")):
+            customer_stats = {k: int(v) if k in int_columns else float(v) for k, v in row.items()}
+            customer_stats["locations"] = locations_by_customer.get(customer_id, {})
+            stats[customer_id] = customer_stats
+        return stats
+
+    @property
+    def nbytes(self):
+        return int(self.by_type.memory_usage(deep=True).sum()
+                   + self.locations.memory_usage(deep=True)
+                   + self.daily.memory_usage(deep=True))
+
+def customer_aggregates(dataset):
+    """Return the cached CustomerAggregates of a registry dataset"""
+    return dataset.derived("customer_aggregates", lambda df: CustomerAggregates(df))
+
+def view_aggregates(df, dataset=None):
+    """
+    Return CustomerAggregates for ``df``, a view of a dataset's transactions.
+
+    When the view holds every transaction of its customers, as a Customer
+    ID or name search does, the dataset's cached aggregates are sliced
+    instead of aggregating the view again.
+    """
+    if dataset is not None:
+        aggregates = customer_aggregates(dataset)
+        if df is dataset.df:
+            return aggregates
+        subset = aggregates.for_customers(df["Customer_ID"].unique())
+        if subset.row_count == len(df):
+            return subset
+    return CustomerAggregates(df)
@@ -0,0 +1,159 @@
+"""
+Overnight AI report generation for a whole customer portfolio.
+
+Statistics for every customer come from one pass over the transactions
+(CustomerAggregates). Model calls are fanned out over a bounded thread
+pool behind a rate limiter, go through the shared report cache, and
+each finished customer is committed to a ReportStore at once, so an
+interrupted run resumes where it stopped.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from banktech.aggregates import CustomerAggregates
+from banktech.charts import generate_location_chart, generate_transaction_amount_chart, generate_transaction_type_chart
+from banktech.reports import get_model, report_cache, report_key, start_report
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE_PER_MINUTE = 60
+
+class RateLimiter:
+    """Spaces calls out so at most ``rate`` start per ``period`` seconds, across threads"""
+
+    def __init__(self, rate, period=60.0):
+        self.interval = period / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(self._next, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+class ReportStore:
+    """
+    Resumable on-disk store of batch report results, one row per customer.
+
+    Each result is committed as soon as it is saved; customers whose
+    report failed are retried by the next run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " customer_id TEXT PRIMARY KEY, customer_name TEXT, status TEXT NOT NULL,"
+                " report TEXT, charts TEXT, updated_at REAL NOT NULL)"
+            )
+
+    def completed(self):
+        """Return the ids (as strings) of customers with a finished report"""
+        with self._lock:
+            rows = self._connection.execute("SELECT customer_id FROM results WHERE status = 'done'")
+            return {customer_id for customer_id, in rows}
+
+    def save(self, customer_id, customer_name, report, failed=False, charts=None):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (str(customer_id), customer_name, "failed" if failed else "done", report, charts, time.time())
+            )
+
+    def counts(self):
+        """Return the number of stored results per status"""
+        with self._lock:
+            return dict(self._connection.execute("SELECT status, COUNT(*) FROM results GROUP BY status"))
+
+    def export(self, directory):
+        """Write every finished report to ``<directory>/<customer_id>.md``; return how many"""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT customer_id, report FROM results WHERE status = 'done'"
+            ).fetchall()
+        for customer_id, report in rows:
+            with open(os.path.join(directory, f"{customer_id}.md"), "w", encoding="utf-8") as f:
+                f.write(report)
+        return len(rows)
+
+    def close(self):
+        self._connection.close()
+
+def customer_names(df):
+    """Return each customer's name as on their first transaction"""
+    first_rows = df.drop_duplicates("Customer_ID")
+    return dict(zip(first_rows["Customer_ID"].tolist(), first_rows["Name"].tolist()))
+
+def _chart_json(aggregates):
+    return json.dumps({
+        "amount": generate_transaction_amount_chart(aggregates).to_json(),
+        "type": generate_transaction_type_chart(aggregates).to_json(),
+        "location": generate_location_chart(aggregates).to_json(),
+    })
+
+def run_portfolio_reports(df, store, customer_ids=None, workers=DEFAULT_WORKERS,
+                          rate_per_minute=DEFAULT_RATE_PER_MINUTE, charts=False,
+                          model=None, cache=None, progress=None):
+    """
+    Generate and store a report for every customer in ``df`` not yet in ``store``.
+
+    ``customer_ids`` limits the run to those customers. At most
+    ``workers`` reports are generated at once and at most
+    ``rate_per_minute`` model calls start per minute; reports already in
+    the report cache cost no model call. With ``charts``, the three
+    Transactions charts are stored as Plotly JSON alongside each report.
+    ``progress(done, total)`` is called after each customer. Returns the
+    store's counts per status.
+    """
+    # Fail fast on a missing API key rather than once per customer
+    model = model or get_model()
+    cache = cache or report_cache
+
+    aggregates = CustomerAggregates(df)
+    stats = aggregates.stats_by_customer()
+    names = customer_names(df)
+
+    completed = store.completed()
+    if customer_ids is None:
+        customer_ids = list(stats)
+    pending = [customer_id for customer_id in customer_ids
+               if customer_id in stats and str(customer_id) not in completed]
+
+    limiter = RateLimiter(rate_per_minute)
+
+    def run_one(customer_id):
+        customer_stats = stats[customer_id]
+        # Only model calls count against the rate limit
+        if cache.get(report_key(customer_id, customer_stats, model.name)) is None:
+            limiter.acquire()
+        job = start_report(customer_stats, names[customer_id], customer_id, model, cache)
+        report = job.result()
+        chart_json = None
+        if charts and not job.failed:
+            chart_json = _chart_json(aggregates.for_customers([customer_id]))
+        store.save(customer_id, names[customer_id], report, job.failed, chart_json)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(run_one, customer_id) for customer_id in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            if progress is not None:
+                progress(done, len(pending))
+    finally:
+        # On an error or Ctrl-C, drop queued customers; finished ones are already stored
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return store.counts()
@@ -0,0 +1,300 @@
+"""
+Bulk salary disbursement.
+
+A validated salary file becomes one PaymentInstruction per employee,
+sent in batches to a payment rail through a RailAdapter. A payroll is
+identified by a payroll ID (the employer or payroll name) and a pay
+period, not by the file, so correcting a file and uploading it again
+keeps its payroll. Every instruction carries an
+idempotency key derived from the payroll and the employee, and batch ids
+are deterministic, so retrying a batch or submitting the same payroll
+again never pays anyone twice, while another pay period is a new
+payroll. Batches go out over a bounded thread pool;
+transient rail failures are retried with exponential backoff and jitter.
+
+FileRailAdapter is a local stand-in for a real rail: it appends accepted
+instructions to one JSON Lines file per payroll.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_ATTEMPTS = 5
+# Seconds before the first retry; doubled on each further attempt
+DEFAULT_BACKOFF = 0.2
+
+PAYMENTS_DIR = os.getenv(
+    "BANKTECH_PAYMENTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "payments")
+)
+# The rail payments go to; "file" is the only one built in
+PAYMENT_RAIL = os.getenv("BANKTECH_PAYMENT_RAIL", "file")
+
+class DisbursementError(Exception):
+    """A payroll that can't be disbursed as given"""
+
+class RailError(Exception):
+    """A rail rejected a batch for good"""
+
+class TransientRailError(RailError):
+    """A rail failure worth retrying: a timeout, throttling or a brief outage"""
+
+class PaymentInstruction:
+    """One employee's salary payment"""
+
+    __slots__ = ("idempotency_key", "payroll_reference", "employee_id", "employee_name",
+                 "account_number", "ifsc", "amount_paise")
+
+    def __init__(self, idempotency_key, payroll_reference, employee_id, employee_name,
+                 account_number, ifsc, amount_paise):
+        self.idempotency_key = idempotency_key
+        self.payroll_reference = payroll_reference
+        self.employee_id = employee_id
+        self.employee_name = employee_name
+        self.account_number = account_number
+        self.ifsc = ifsc
+        self.amount_paise = amount_paise
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def payroll_reference(payroll_id, pay_period):
+    """
+    Return the reference of payroll ``payroll_id`` for ``pay_period`` (e.g. "2026-10").
+
+    It depends on neither the file nor its contents, so a corrected file
+    uploaded again for the same payroll and period is recognised, and
+    employees already paid from the first upload are not paid again.
+    Payroll IDs are compared ignoring case and surrounding spaces.
+    """
+    payroll_id = " ".join(payroll_id.split()).upper()
+    if not payroll_id:
+        raise DisbursementError("A payroll ID is required")
+    digest = hashlib.blake2b(f"{pay_period}:{payroll_id}".encode("utf-8"), digest_size=6).hexdigest().upper()
+    return f"PAY{pay_period.replace('-', '')}{digest}"
+
+def idempotency_key(payroll, employee_id):
+    """Return the key that makes an employee's payment in a payroll unique"""
+    return hashlib.blake2b(f"{payroll}:{employee_id}".encode("utf-8"), digest_size=16).hexdigest()
+
+def payment_instructions(df, payroll):
+    """Return a PaymentInstruction for every row of a salary DataFrame"""
+    duplicated = df["Employee ID"].duplicated(keep=False)
+    if duplicated.any():
+        raise DisbursementError(
+            f"{int(duplicated.sum())} rows share an Employee ID, e.g. {df.loc[duplicated, 'Employee ID'].iloc[0]}"
+        )
+    # Amounts travel as whole paise so no float rounding reaches the rail
+    amounts = np.rint(df["Salary Amount (INR)"].to_numpy(dtype=float) * 100).astype(np.int64)
+    return [
+        PaymentInstruction(idempotency_key(payroll, employee_id), payroll, employee_id, name, account, ifsc, amount)
+        for employee_id, name, account, ifsc, amount in zip(
+            df["Employee ID"].astype(str).tolist(), df["Employee Name"].tolist(),
+            df["Bank Account Number"].astype(str).tolist(), df["IFSC Code"].tolist(), amounts.tolist()
+        )
+    ]
+
+# How a rail answered one instruction; ``replayed`` is True when it had already accepted the key
+Acceptance = namedtuple("Acceptance", ["rail_reference", "replayed"])
+
+class RailAdapter:
+    """
+    Interface to a payment rail.
+
+    ``submit`` sends one batch and returns ``{idempotency_key:
+    Acceptance}`` for the instructions the rail accepted. It must be
+    idempotent: an instruction whose key the rail has already accepted
+    is answered with its original reference, marked as replayed, and
+    not paid again.
+    """
+
+    name = None
+
+    def submit(self, batch_id, instructions):
+        raise NotImplementedError
+
+class FileRailAdapter(RailAdapter):
+    """
+    Local stand-in rail that appends accepted instructions to ``<directory>/<payroll>.jsonl``.
+
+    ``failure_rate`` makes that share of submissions fail with a
+    TransientRailError, to exercise retries. Accepted keys are cached
+    per adapter, so every writer to a directory must share one adapter;
+    get_rail() returns the same one to every session.
+    """
+
+    name = "file"
+
+    def __init__(self, directory=PAYMENTS_DIR, failure_rate=0.0, seed=None):
+        self.directory = directory
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # One lock per payroll file, held only to check and reserve keys and to append
+        self._payroll_locks = {}
+        # Accepted idempotency keys and their references, per payroll file
+        self._accepted = {}
+
+    def _path(self, payroll):
+        return os.path.join(self.directory, f"{payroll}.jsonl")
+
+    def _payroll_lock(self, payroll):
+        with self._lock:
+            return self._payroll_locks.setdefault(payroll, threading.Lock())
+
+    def _accepted_for(self, payroll):
+        if payroll not in self._accepted:
+            accepted = {}
+            if os.path.exists(self._path(payroll)):
+                with open(self._path(payroll), encoding="utf-8") as f:
+                    for line in f:
+                        record = json.loads(line)
+                        accepted[record["idempotency_key"]] = record["rail_reference"]
+            self._accepted[payroll] = accepted
+        return self._accepted[payroll]
+
+    def submit(self, batch_id, instructions):
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            raise TransientRailError(f"simulated rail timeout for batch {batch_id}")
+
+        os.makedirs(self.directory, exist_ok=True)
+        references = {}
+        by_payroll = {}
+        for instruction in instructions:
+            by_payroll.setdefault(instruction.payroll_reference, []).append(instruction)
+
+        for payroll, payroll_instructions in by_payroll.items():
+            lock = self._payroll_lock(payroll)
+            # Reserve the new keys, then serialize them outside the lock
+            with lock:
+                accepted = self._accepted_for(payroll)
+                new = []
+                for instruction in payroll_instructions:
+                    key = instruction.idempotency_key
+                    replayed = key in accepted
+                    if not replayed:
+                        accepted[key] = f"RAIL{key[:16].upper()}"
+                        new.append(instruction)
+                    references[key] = Acceptance(accepted[key], replayed)
+            if not new:
+                continue
+
+            lines = []
+            for instruction in new:
+                record = instruction.to_dict()
+                record.update(batch_id=batch_id, rail_reference=accepted[instruction.idempotency_key])
+                lines.append(json.dumps(record))
+            with lock:
+                try:
+                    with open(self._path(payroll), "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                except OSError as e:
+                    # Not written, so not accepted: a retry may send them again
+                    for instruction in new:
+                        accepted.pop(instruction.idempotency_key, None)
+                    raise TransientRailError(f"could not record batch {batch_id}: {e}") from e
+        return references
+
+# One adapter per process, so every session shares its lock and accepted keys
+_rail = None
+_rail_lock = threading.Lock()
+
+def get_rail():
+    """Return the configured payment rail, shared by every session"""
+    global _rail
+    with _rail_lock:
+        if _rail is None:
+            if PAYMENT_RAIL != "file":
+                raise DisbursementError(f"Unknown payment rail {PAYMENT_RAIL!r}")
+            _rail = FileRailAdapter()
+        return _rail
+
+class DisbursementResult:
+    """What happened to a payroll's instructions"""
+
+    def __init__(self, payroll, total):
+        self.payroll_reference = payroll
+        self.total = total
+        # Instructions paid by this submission
+        self.paid = 0
+        self.paid_paise = 0
+        # Instructions the rail had accepted on an earlier submission of the payroll
+        self.already_paid = 0
+        self.already_paid_paise = 0
+        self.batches = 0
+        self.retries = 0
+        # (instruction, reason) for every payment that didn't go through
+        self.failed = []
+
+    @property
+    def paid_amount(self):
+        return self.paid_paise / 100
+
+    @property
+    def already_paid_amount(self):
+        return self.already_paid_paise / 100
+
+def _send_batch(rail, batch_id, batch, max_attempts, backoff):
+    """Submit one batch, retrying transient failures; return (references, retries, error)"""
+    for attempt in range(max_attempts):
+        try:
+            return rail.submit(batch_id, batch), attempt, None
+        except TransientRailError as e:
+            if attempt == max_attempts - 1:
+                return {}, attempt, f"gave up after {max_attempts} attempts: {e}"
+            # Full jitter keeps retrying workers from hitting the rail in lockstep
+            time.sleep(backoff * 2 ** attempt * random.random())
+        except RailError as e:
+            return {}, attempt, str(e)
+
+def disburse(df, payroll, rail=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+             max_attempts=DEFAULT_MAX_ATTEMPTS, backoff=DEFAULT_BACKOFF, progress=None):
+    """
+    Pay every employee in a salary DataFrame and return a DisbursementResult.
+
+    Instructions go to ``rail`` in batches of ``batch_size``, at most
+    ``workers`` batches at a time. ``progress(sent, total)`` is called
+    as batches finish. Running the same payroll again pays nobody twice;
+    instructions accepted before are counted in ``already_paid``.
+    """
+    rail = rail or get_rail()
+    instructions = payment_instructions(df, payroll)
+    result = DisbursementResult(payroll, len(instructions))
+    batches = [instructions[start:start + batch_size] for start in range(0, len(instructions), batch_size)]
+    result.batches = len(batches)
+
+    sent = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_send_batch, rail, f"{payroll}-{number:06d}", batch, max_attempts, backoff): batch
+            for number, batch in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            references, retries, error = future.result()
+            result.retries += retries
+            for instruction in batch:
+                acceptance = references.get(instruction.idempotency_key)
+                if acceptance is None:
+                    result.failed.append((instruction, error or "not accepted by the rail"))
+                elif acceptance.replayed:
+                    result.already_paid += 1
+                    result.already_paid_paise += instruction.amount_paise
+                else:
+                    result.paid += 1
+                    result.paid_paise += instruction.amount_paise
+            sent += len(batch)
+            if progress is not None:
+                progress(sent, len(instructions))
+    return result
@@ -0,0 +1,90 @@
+"""
+Process-wide cache of Plotly figures shared by every page and session.
+
+Figures are kept as their serialized Plotly JSON, keyed by chart type
+and a key describing the data drawn (typically a dataset key and the
+filter applied to it). A rerun with unchanged data re-emits the chart
+from its JSON instead of rebuilding it through plotly.express. Memory is
+bounded by a byte ceiling with least-recently-used eviction.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from banktech.lazy import lazy_import
+
+pio = lazy_import("plotly.io")
+
+DEFAULT_MAX_BYTES = int(os.getenv("BANKTECH_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+class FigureCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._figures = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def figure(self, chart, key, builder):
+        """
+        Return the ``chart`` figure for ``key``, calling ``builder()`` only on a miss.
+
+        ``key`` must be hashable and change whenever the data drawn does.
+        """
+        cache_key = (chart, key)
+        with self._lock:
+            figure_json = self._figures.get(cache_key)
+            if figure_json is not None:
+                self._figures.move_to_end(cache_key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if figure_json is not None:
+            return pio.from_json(figure_json)
+
+        # Build outside the lock so other charts stay available
+        fig = builder()
+        figure_json = fig.to_json()
+        nbytes = sys.getsizeof(figure_json)
+
+        with self._lock:
+            # Figures larger than the whole cache are never stored
+            if cache_key not in self._figures and nbytes <= self.max_bytes:
+                self._figures[cache_key] = figure_json
+                self._bytes += nbytes
+                self._evict()
+        return fig
+
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            _, figure_json = self._figures.popitem(last=False)
+            self._bytes -= sys.getsizeof(figure_json)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "figures": len(self._figures),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+# The figure cache shared by every page and session in this server process
+figure_cache = FigureCache()
+
+def cached_figure(chart, key, builder):
+    """Return ``builder()``'s figure from the shared figure cache"""
+    return figure_cache.figure(chart, key, builder)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+class KeyIndex:
+    """
+    Sorted-array index from a column's values to row positions.
+
+    Built once per dataset with a stable argsort; a lookup is two binary
+    searches, and the positions it returns are in row order, matching a
+    boolean-mask scan of the column.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.order = np.argsort(values, kind="stable")
+        self.sorted_values = values[self.order]
+
+    def lookup(self, key):
+        """Return the row positions whose value equals ``key``"""
+        start = np.searchsorted(self.sorted_values, key, side="left")
+        end = np.searchsorted(self.sorted_values, key, side="right")
+        return self.order[start:end]
+
+    @property
+    def nbytes(self):
+        return self.order.nbytes + self.sorted_values.nbytes
+
+def key_index(dataset, column):
+    """Return the cached KeyIndex for ``column`` of a registry dataset"""
+    return dataset.derived(f"key_index:{column}", lambda df: KeyIndex(df[column].to_numpy()))
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# Match-quality ranks used when ranking name search results
+EXACT_MATCH, PREFIX_MATCH, WORD_PREFIX_MATCH, SUBSTRING_MATCH = range(4)
+
+class NameIndex:
+    """
+    Case-insensitive substring index over a text column.
+
+    The index covers the column's unique values only: a trigram inverted
+    index narrows a query down to a few candidate names, which are then
+    checked with a plain substring test (so regex metacharacters in the
+    query are matched literally) and mapped back to row positions.
+
+    A name matches when ``term.lower() in str(name).lower()``; missing
+    names never match. For most text that is what
+    ``str.contains(term, case=False, regex=False)`` returns, but pandas
+    folds case differently, and differently per string dtype, for a few
+    characters such as "ß" and "İ".
+    """
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        self.codes = codes.astype(np.int32)
+        self.names = np.array([str(name).lower() for name in uniques], dtype=object)
+
+        # Collect (gram, name id) pairs, then group them with one sort
+        grams, gram_name_ids = [], []
+        for name_id, name in enumerate(self.names):
+            name_grams = _ngrams(name, 3)
+            grams.extend(name_grams)
+            gram_name_ids.extend([name_id] * len(name_grams))
+        gram_codes, unique_grams = pd.factorize(pd.Series(grams, dtype=object))
+        by_gram = np.argsort(gram_codes, kind="stable")
+        gram_name_ids = np.array(gram_name_ids, dtype=np.int32)[by_gram]
+        gram_bounds = np.searchsorted(gram_codes[by_gram], np.arange(len(unique_grams) + 1))
+        self.postings = {
+            gram: gram_name_ids[gram_bounds[i]:gram_bounds[i + 1]]
+            for i, gram in enumerate(unique_grams)
+        }
+
+        # Rows of each unique name, grouped: rows of name i are order[bounds[i]:bounds[i + 1]]
+        self.order = np.argsort(self.codes, kind="stable")
+        self.bounds = np.searchsorted(self.codes[self.order], np.arange(len(self.names) + 1))
+
+    def matching_names(self, term):
+        """Return the ids of the unique names containing ``term``, ignoring case"""
+        term = term.lower()
+        if len(term) < 3:
+            # Too short for trigrams: scan the unique names, not the rows
+            return np.array([i for i, name in enumerate(self.names) if term in name], dtype=np.int32)
+
+        postings = []
+        for trigram in _ngrams(term, 3):
+            if trigram not in self.postings:
+                return np.array([], dtype=np.int32)
+            postings.append(self.postings[trigram])
+        postings.sort(key=len)
+        candidates = postings[0]
+        for other in postings[1:]:
+            candidates = np.intersect1d(candidates, other, assume_unique=True)
+        return np.array([i for i in candidates if term in self.names[i]], dtype=np.int32)
+
+    def match_rank(self, name_id, term):
+        """Rank how well a matching name fits the search term; lower is better"""
+        name = self.names[name_id]
+        if name == term:
+            return EXACT_MATCH
+        if name.startswith(term):
+            return PREFIX_MATCH
+        if f" {term}" in name:
+            return WORD_PREFIX_MATCH
+        return SUBSTRING_MATCH
+
+    def search(self, term, ranked=False):
+        """
+        Return the row positions whose value contains ``term``, ignoring case.
+
+        Positions are in row order, or grouped best match first (exact,
+        prefix, word prefix, substring) when ``ranked`` is true.
+        """
+        name_ids = self.matching_names(term)
+        if len(name_ids) == 0:
+            return np.array([], dtype=np.intp)
+
+        # Few matching rows: gather their groups; many: one pass over the codes
+        group_sizes = self.bounds[name_ids + 1] - self.bounds[name_ids]
+        if group_sizes.sum() * 16 < len(self.codes):
+            rows = np.sort(np.concatenate([self.order[self.bounds[i]:self.bounds[i + 1]] for i in name_ids]))
+        else:
+            hit = np.zeros(len(self.names), dtype=bool)
+            hit[name_ids] = True
+            rows = np.flatnonzero(hit[self.codes] & (self.codes >= 0))
+
+        if ranked:
+            term = term.lower()
+            rank_of_name = np.zeros(len(self.names), dtype=np.int8)
+            for i in name_ids:
+                rank_of_name[i] = self.match_rank(i, term)
+            rows = rows[np.argsort(rank_of_name[self.codes[rows]], kind="stable")]
+        return rows
+
+    @property
+    def nbytes(self):
+        return (self.codes.nbytes + self.order.nbytes + self.bounds.nbytes
+                + sum(len(name) for name in self.names)
+                + sum(ids.nbytes for ids in self.postings.values()))
+
+def name_index(dataset, column="Name"):
+    """Return the cached NameIndex for ``column`` of a registry dataset"""
+    return dataset.derived(f"name_index:{column}", lambda df: NameIndex(df[column]))
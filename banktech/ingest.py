@@ -0,0 +1,234 @@
+"""
+Convert uploaded CSV extracts to content-hashed Arrow IPC files.
+
+The first upload of an extract is parsed once with its declared schema
+(categorical text, compact integers, parsed dates and flags) and written
+to the cache directory as an uncompressed Arrow IPC (Feather v2) file
+named after a hash of its bytes. Every later open of the same
+extract memory-maps that file instead of parsing the CSV again.
+"""
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+CACHE_DIR = os.getenv(
+    "BANKTECH_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "datasets")
+)
+
+# The 20-column transaction layout used by the Transactions and Credit Risk pages
+TRANSACTION_COLUMNS = [
+    "Transaction_ID", "Customer_ID", "Name", "Age", "Income", "Credit_Score",
+    "Account_Type", "Existing_Loan", "EMI_Amount", "Credit_Utilization",
+    "Default_History", "Transaction_Date", "Transaction_Amount", "Transaction_Type",
+    "Description", "Unusual_Transaction", "Transaction_Location",
+    "Bank_Ledger_Amount", "Reconciliation_Status", "Bulk_Payment_Type"
+]
+
+# Bump whenever a schema or its conversions change, so cached extracts are ingested again
+SCHEMA_VERSION = 3
+
+class SchemaError(ValueError):
+    """An extract whose values don't fit its declared schema"""
+
+# Column kinds and the dtype each kind is parsed with. Dates and booleans are
+# read as categoricals so only their distinct values are converted. Integers
+# are inferred, so gaps and stray text reach apply_schema instead of failing the parse.
+_READ_DTYPES = {
+    "string": str,
+    "category": "category",
+    "integer": None,
+    "float": "float64",
+    "date": "category",
+    "boolean": "category",
+}
+
+# Text with few distinct values is categorical, integers are downcast to the
+# smallest type that fits, and amounts stay float64 so paise aren't rounded.
+# Existing_Loan and Default_History stay Yes/No text: the pages show and compare them as such.
+TRANSACTION_SCHEMA = {
+    "Transaction_ID": "integer",
+    "Customer_ID": "integer",
+    "Name": "category",
+    "Age": "integer",
+    "Income": "float",
+    "Credit_Score": "integer",
+    "Account_Type": "category",
+    "Existing_Loan": "category",
+    "EMI_Amount": "float",
+    "Credit_Utilization": "float",
+    "Default_History": "category",
+    "Transaction_Date": "date",
+    "Transaction_Amount": "float",
+    "Transaction_Type": "category",
+    "Description": "category",
+    "Unusual_Transaction": "boolean",
+    "Transaction_Location": "category",
+    "Bank_Ledger_Amount": "float",
+    "Reconciliation_Status": "category",
+    "Bulk_Payment_Type": "category",
+}
+
+# Account numbers and IFSC codes are identifiers, not numbers: keep leading zeros
+SALARY_SCHEMA = {
+    "Employee ID": "string",
+    "Employee Name": "string",
+    "Bank Account Number": "string",
+    "IFSC Code": "string",
+    "Salary Amount (INR)": "float",
+}
+
+# Schemas apply only to the columns a file actually has; anything else is inferred
+SCHEMAS = {
+    "transactions": TRANSACTION_SCHEMA,
+    "salary": SALARY_SCHEMA,
+}
+
+_TRUE_VALUES = {"yes", "y", "true", "t", "1"}
+_FALSE_VALUES = {"no", "n", "false", "f", "0"}
+
+def _take_categories(values, converted, na_value):
+    """Map a categorical column through ``converted``, one value per category"""
+    # Missing values have code -1, which picks the appended na_value
+    return np.append(converted, na_value)[values.cat.codes.to_numpy()]
+
+def _to_dates(column, values):
+    categories = values.cat.categories.astype(str)
+    dates = pd.to_datetime(categories, format="ISO8601", errors="coerce")
+    if dates.isna().any():
+        dates = pd.to_datetime(categories, format="mixed", errors="coerce")
+    bad = categories[dates.isna()]
+    if len(bad):
+        raise SchemaError(f"{column} has {len(bad)} values that are not dates, such as {bad[0]!r}")
+    return pd.Series(_take_categories(values, dates.to_numpy(), np.datetime64("NaT")), index=values.index, name=column)
+
+def _to_booleans(column, values):
+    categories = values.cat.categories.astype(str).str.strip().str.lower()
+    bad = categories[~categories.isin(_TRUE_VALUES | _FALSE_VALUES)]
+    if len(bad):
+        raise SchemaError(f"{column} has {len(bad)} values that are not yes/no flags, such as {bad[0]!r}")
+    flags = _take_categories(values, categories.isin(_TRUE_VALUES).astype(object), None)
+    return pd.Series(pd.array(flags, dtype="boolean"), index=values.index, name=column)
+
+def _to_integers(column, values):
+    if pd.api.types.is_integer_dtype(values):
+        return pd.to_numeric(values, downcast="integer")
+    numbers = pd.to_numeric(values, errors="coerce")
+    bad = values[numbers.isna() & values.notna()]
+    if len(bad):
+        raise SchemaError(f"{column} has {len(bad)} values that are not integers, such as {bad.iloc[0]!r}")
+    # Columns with gaps or fractions stay float64, as the pages have always read them
+    return numbers.astype("float64")
+
+def apply_schema(df, schema):
+    """Convert the columns of a freshly parsed extract to their schema types"""
+    for column, kind in schema.items():
+        if column not in df.columns:
+            continue
+        if kind == "integer":
+            df[column] = _to_integers(column, df[column])
+        elif kind == "date":
+            df[column] = _to_dates(column, df[column])
+        elif kind == "boolean":
+            df[column] = _to_booleans(column, df[column])
+    return df
+
+def read_csv_typed(source, schema="transactions"):
+    """Parse a CSV file with its schema's dtypes and conversions"""
+    columns = SCHEMAS.get(schema, {})
+    # Parse amounts exactly as written, the same as the streaming reconciliation engine
+    dtypes = {column: _READ_DTYPES[kind] for column, kind in columns.items() if _READ_DTYPES[kind] is not None}
+    df = pd.read_csv(source, dtype=dtypes,
+                     float_precision="round_trip")
+    return apply_schema(df, columns)
+
+_HASH_CHUNK_SIZE = 8 * 1024 * 1024
+# Remember the digest of recent uploads so reruns don't rehash the same bytes
+_MAX_REMEMBERED_UPLOADS = 64
+_upload_keys = OrderedDict()
+
+def content_hash(source):
+    """
+    Return a hex digest of a file's bytes.
+
+    Accepts a path or a binary file object (such as a Streamlit
+    UploadedFile); file objects are rewound afterwards.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    if hasattr(source, "getbuffer"):
+        # In-memory uploads can be hashed without copying
+        digest.update(source.getbuffer())
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest()
+
+def dataset_key(source, schema="transactions"):
+    """Return the cache key of a file under the given schema"""
+    upload_id = getattr(source, "file_id", None)
+    if upload_id is not None and (upload_id, schema) in _upload_keys:
+        _upload_keys.move_to_end((upload_id, schema))
+        return _upload_keys[(upload_id, schema)]
+
+    key = f"{schema}-v{SCHEMA_VERSION}-{content_hash(source)}"
+
+    if upload_id is not None:
+        _upload_keys[(upload_id, schema)] = key
+        if len(_upload_keys) > _MAX_REMEMBERED_UPLOADS:
+            _upload_keys.popitem(last=False)
+    return key
+
+def dataset_path(key):
+    """Return the Arrow IPC path for a cache key"""
+    return os.path.join(CACHE_DIR, f"{key}.arrow")
+
+def ingest_csv(source, schema="transactions"):
+    """
+    Convert a CSV file to a cached Arrow IPC file, once.
+
+    Returns the dataset key. If a file with the same bytes has already
+    been ingested under ``schema``, nothing is parsed.
+    """
+    key = dataset_key(source, schema)
+    path = dataset_path(key)
+    if os.path.exists(path):
+        return key
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    df = read_csv_typed(source, schema)
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    # Write to a temporary file first so concurrent readers never see a partial file
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return key
+
+def open_dataset(key, columns=None):
+    """Memory-map a cached dataset and return it as a DataFrame"""
+    return feather.read_feather(dataset_path(key), columns=columns, memory_map=True)
+
+def load_csv(source, schema="transactions"):
+    """Return the DataFrame for a CSV file, going through the Arrow cache"""
+    return open_dataset(ingest_csv(source, schema))
@@ -0,0 +1,44 @@
+"""
+Deferred imports of heavy dependencies.
+
+``lazy_import("plotly.express")`` returns a stand-in that imports the
+real module on first attribute access, so a page that never draws a
+chart or generates a report never pays for plotly or
+google.generativeai on a cold start. ``scripts/benchmark_imports.py``
+keeps an eye on what pages still import eagerly.
+"""
+import importlib
+
+class LazyModule:
+    """A module that is imported the first time one of its attributes is used"""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            # The import system's own module locks make this safe across threads
+            module = importlib.import_module(self._name)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+_modules = {}
+
+def lazy_import(name):
+    """Return a LazyModule for ``name``, shared by every caller"""
+    return _modules.setdefault(name, LazyModule(name))
@@ -0,0 +1,345 @@
+import csv
+import heapq
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+
+MATCHED = "Matched"
+UNMATCHED = "Unmatched"
+STATUS_DTYPE = pd.CategoricalDtype([MATCHED, UNMATCHED])
+
+# Amounts within atol + rtol * max(|bank|, |customer|) of each other match.
+# The default half-paisa absolute tolerance absorbs float noise at any size
+# of amount, while any difference of a paisa or more is still unmatched.
+DEFAULT_ATOL = 0.005
+DEFAULT_RTOL = 0.0
+
+def prepare_ledgers(bank_df, customer_df):
+    """Select and rename the columns compared during reconciliation"""
+    bank_prepared = bank_df[['Transaction_ID', 'Transactions_Amount']].copy()
+    bank_prepared.columns = ['Transaction_ID', 'Bank_Amount']
+
+    customer_prepared = customer_df[['Transaction_ID', 'Transaction_Amount']].copy()
+    customer_prepared.columns = ['Transaction_ID', 'Customer_Amount']
+    return bank_prepared, customer_prepared
+
+def reconciliation_status(bank_amount, customer_amount, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL):
+    """
+    Return Matched/Unmatched for each pair of amounts as a categorical.
+
+    A pair is unmatched when either amount is missing or the amounts
+    differ by more than the tolerance.
+    """
+    bank_amount = np.asarray(bank_amount, dtype=float)
+    customer_amount = np.asarray(customer_amount, dtype=float)
+
+    tolerance = atol + rtol * np.maximum(np.abs(bank_amount), np.abs(customer_amount))
+    # NaN differences compare False, so missing amounts are unmatched
+    matched = np.abs(bank_amount - customer_amount) <= tolerance
+
+    return pd.Categorical.from_codes(np.where(matched, 0, 1), dtype=STATUS_DTYPE)
+
+def reconcile(bank_df, customer_df, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL):
+    """Outer-join both ledgers on Transaction_ID and flag each transaction"""
+    bank_prepared, customer_prepared = prepare_ledgers(bank_df, customer_df)
+    return reconcile_prepared(bank_prepared, customer_prepared, atol, rtol)
+
+def reconcile_prepared(bank_prepared, customer_prepared, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL):
+    """Reconcile ledgers already reduced to Transaction_ID and Bank/Customer_Amount"""
+    # Merge the dataframes on Transaction_ID; an outer merge sorts by the key
+    merged = pd.merge(bank_prepared, customer_prepared, on='Transaction_ID', how='outer')
+    merged['Reconciliation_Status'] = reconciliation_status(
+        merged['Bank_Amount'], merged['Customer_Amount'], atol, rtol
+    )
+    return merged
+
+def summarize(status_counts):
+    """Return counts and percentages for each status"""
+    total_records = int(sum(status_counts.get(status, 0) for status in STATUS_DTYPE.categories))
+
+    status_percentages = {}
+    for status in STATUS_DTYPE.categories:
+        count = int(status_counts.get(status, 0))
+        percentage = (count / total_records) * 100 if total_records > 0 else 0
+        status_percentages[status] = {
+            'count': count,
+            'percentage': percentage
+        }
+    return status_percentages, total_records
+
+# Columns read from each ledger by the streaming engine, and their names after preparation
+_LEDGER_COLUMNS = {
+    'bank': ('Transactions_Amount', 'Bank_Amount'),
+    'customer': ('Transaction_Amount', 'Customer_Amount'),
+}
+RESULT_COLUMNS = ['Transaction_ID', 'Bank_Amount', 'Customer_Amount', 'Reconciliation_Status']
+DEFAULT_BUCKETS = 64
+DEFAULT_CHUNKSIZE = 500_000
+
+def partition_of(transaction_ids, n_partitions):
+    """
+    Return the hash partition of each Transaction_ID.
+
+    Equal IDs of different dtypes (5 and 5.0) hash differently, so every
+    ledger partitioned together must be read with the same ID dtype.
+    """
+    return pd.util.hash_array(np.asarray(transaction_ids)) % np.uint64(n_partitions)
+
+def range_partition_of(transaction_ids, bounds):
+    """
+    Return the range partition of each Transaction_ID: how many ``bounds`` are at or below it.
+
+    IDs compare by value whatever their dtype, so 5 and 5.0 share a
+    partition. Missing IDs go to the last partition.
+    """
+    transaction_ids = np.asarray(transaction_ids)
+    missing = pd.isna(transaction_ids)
+    parts = np.full(len(transaction_ids), len(bounds), dtype=np.intp)
+    parts[~missing] = np.searchsorted(bounds, transaction_ids[~missing], side="right")
+    return parts
+
+def range_bounds(transaction_ids, n_partitions, sample_size=65536):
+    """Return ``n_partitions - 1`` increasing Transaction_IDs splitting a sample of the IDs evenly"""
+    transaction_ids = np.asarray(transaction_ids)
+    sample = transaction_ids[::max(1, len(transaction_ids) // sample_size)]
+    sample = np.sort(sample[~pd.isna(sample)])
+    if len(sample) == 0:
+        return sample
+    return sample[np.arange(1, n_partitions) * len(sample) // n_partitions]
+
+# Worker pools are started once and reused; starting processes costs more than a merge
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(workers):
+    with _pools_lock:
+        if workers not in _pools:
+            # Spawn rather than fork: the Streamlit server process is multi-threaded
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pools[workers]
+
+def _reconcile_partition(bank_columns, customer_columns, atol, rtol):
+    bank_prepared = pd.DataFrame(dict(zip(['Transaction_ID', 'Bank_Amount'], bank_columns)))
+    customer_prepared = pd.DataFrame(dict(zip(['Transaction_ID', 'Customer_Amount'], customer_columns)))
+    merged = reconcile_prepared(bank_prepared, customer_prepared, atol, rtol)
+    return merged, merged['Reconciliation_Status'].value_counts()
+
+def _split_by_partition(columns, parts, n_partitions):
+    """Split columns into one slice per partition with a single stable sort of the partition numbers"""
+    # Small integers take numpy's linear-time radix sort
+    order = np.argsort(parts.astype(np.uint16), kind="stable")
+    bounds = np.searchsorted(parts[order], np.arange(n_partitions + 1))
+    columns = [column.take(order) for column in columns]
+    return [[column[bounds[part]:bounds[part + 1]] for column in columns] for part in range(n_partitions)]
+
+def reconcile_parallel(bank_df, customer_df, workers, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL):
+    """
+    Reconcile on several cores by range-partitioning both ledgers by Transaction_ID.
+
+    Each partition, a contiguous range of IDs, is reconciled in a worker
+    process. Every partial result is sorted by Transaction_ID and the
+    ranges are in order, so concatenating them gives exactly the frame
+    reconcile() returns, without sorting again. Returns the merged frame
+    and the summed status counts.
+    """
+    if workers <= 1:
+        bank_prepared, customer_prepared = prepare_ledgers(bank_df, customer_df)
+        merged = reconcile_prepared(bank_prepared, customer_prepared, atol, rtol)
+        return merged, merged['Reconciliation_Status'].value_counts()
+
+    # Only the two compared columns of each ledger are sent to the workers, as arrays
+    bank_columns = [bank_df['Transaction_ID'].to_numpy(), bank_df['Transactions_Amount'].to_numpy()]
+    customer_columns = [customer_df['Transaction_ID'].to_numpy(), customer_df['Transaction_Amount'].to_numpy()]
+    bounds = range_bounds(bank_columns[0], workers)
+    bank_parts = _split_by_partition(bank_columns, range_partition_of(bank_columns[0], bounds), workers)
+    customer_parts = _split_by_partition(customer_columns, range_partition_of(customer_columns[0], bounds), workers)
+
+    pool = _get_pool(workers)
+    futures = [
+        pool.submit(_reconcile_partition, bank_parts[part], customer_parts[part], atol, rtol)
+        for part in range(workers)
+    ]
+    partials = [future.result() for future in futures]
+
+    merged = pd.concat([partial for partial, _ in partials], ignore_index=True)
+
+    status_counts = pd.Series(0, index=STATUS_DTYPE.categories, dtype='int64')
+    for _, partial_counts in partials:
+        status_counts += partial_counts
+    return merged, status_counts
+
+def _source_size(source):
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer().nbytes
+    try:
+        return os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError):
+        return None
+
+def _buckets_of(transaction_ids, n_buckets):
+    """Return the bucket of each nullable Transaction_ID; blank IDs all share bucket 0"""
+    missing = transaction_ids.isna().to_numpy()
+    buckets = np.zeros(len(transaction_ids), dtype=np.uint64)
+    buckets[~missing] = partition_of(transaction_ids[~missing].to_numpy(dtype='int64'), n_buckets)
+    return buckets
+
+def _partition_ledger(source, side, work_dir, n_buckets, chunksize, report):
+    """Split one CSV ledger into per-bucket CSV files, one chunk at a time"""
+    amount_column, prepared_column = _LEDGER_COLUMNS[side]
+
+    with ExitStack() as stack:
+        if isinstance(source, (str, os.PathLike)):
+            source = stack.enter_context(open(source, "rb"))
+        else:
+            source.seek(0)
+        size = _source_size(source)
+
+        reader = pd.read_csv(
+            source,
+            usecols=['Transaction_ID', amount_column],
+            dtype={'Transaction_ID': 'Int64', amount_column: 'float64'},
+            chunksize=chunksize,
+            float_precision="round_trip",
+        )
+        for chunk in reader:
+            chunk = chunk[['Transaction_ID', amount_column]]
+            chunk.columns = ['Transaction_ID', prepared_column]
+            buckets = _buckets_of(chunk['Transaction_ID'], n_buckets)
+            for bucket, part in chunk.groupby(buckets, sort=False):
+                path = os.path.join(work_dir, f"{side}-{bucket}.csv")
+                part.to_csv(path, mode="a", index=False, header=not os.path.exists(path))
+            report(source.tell() / size if size else None)
+
+        if hasattr(source, "seek"):
+            source.seek(0)
+
+def _read_bucket(work_dir, side, bucket):
+    _, prepared_column = _LEDGER_COLUMNS[side]
+    path = os.path.join(work_dir, f"{side}-{bucket}.csv")
+    if not os.path.exists(path):
+        return pd.DataFrame({'Transaction_ID': pd.Series(dtype='Int64'),
+                             prepared_column: pd.Series(dtype='float64')})
+    # to_csv writes the shortest repr of each float; read it back bit for bit
+    return pd.read_csv(path, dtype={'Transaction_ID': 'Int64', prepared_column: 'float64'},
+                       float_precision="round_trip")
+
+def _merge_sorted_buckets(bucket_paths, output_path):
+    """K-way merge per-bucket results, each sorted by Transaction_ID, into one file"""
+    with ExitStack() as stack:
+        readers = [csv.reader(stack.enter_context(open(path, newline=""))) for path in bucket_paths]
+        out = stack.enter_context(open(output_path, "w", newline=""))
+        writer = csv.writer(out)
+        writer.writerow(RESULT_COLUMNS)
+        # A Transaction_ID lives in exactly one bucket, so ties never cross files.
+        # Blank IDs sort last, as in reconcile()
+        writer.writerows(heapq.merge(*readers, key=lambda row: (row[0] == "", int(row[0] or 0))))
+
+def reconcile_chunked(bank_source, customer_source, output_path, atol=DEFAULT_ATOL, rtol=DEFAULT_RTOL,
+                      n_buckets=DEFAULT_BUCKETS, chunksize=DEFAULT_CHUNKSIZE, progress=None, work_dir=None):
+    """
+    Reconcile two CSV ledgers with bounded memory and write the result as CSV.
+
+    Both ledgers are read in chunks and hash-partitioned by Transaction_ID
+    into on-disk buckets. Buckets are reconciled one at a time and their
+    sorted results merged into ``output_path``, so the file holds exactly
+    the rows reconcile() returns, in the same order; blank IDs are kept
+    and read back as missing values of a nullable Int64 column, where
+    reconcile() of the same CSVs has NaN. ``progress`` is
+    called as ``progress(fraction, message)``. Returns the status counts.
+    """
+    def report(start, end, message):
+        def _report(fraction):
+            if progress is not None:
+                progress(start + (end - start) * (fraction if fraction is not None else 0), message)
+        return _report
+
+    status_counts = pd.Series(0, index=STATUS_DTYPE.categories, dtype='int64')
+
+    work_dir = tempfile.mkdtemp(prefix="reconcile-", dir=work_dir)
+    try:
+        _partition_ledger(bank_source, 'bank', work_dir, n_buckets, chunksize,
+                          report(0.0, 0.3, "Partitioning bank ledger..."))
+        _partition_ledger(customer_source, 'customer', work_dir, n_buckets, chunksize,
+                          report(0.3, 0.6, "Partitioning customer records..."))
+
+        bucket_report = report(0.6, 0.9, "Reconciling partitions...")
+        bucket_paths = []
+        for bucket in range(n_buckets):
+            merged = reconcile_prepared(_read_bucket(work_dir, 'bank', bucket),
+                                        _read_bucket(work_dir, 'customer', bucket), atol, rtol)
+            path = os.path.join(work_dir, f"result-{bucket}.csv")
+            merged.to_csv(path, index=False, header=False)
+            bucket_paths.append(path)
+            status_counts += merged['Reconciliation_Status'].value_counts()
+            bucket_report((bucket + 1) / n_buckets)
+
+        report(0.9, 1.0, "Writing results...")(0.0)
+        _merge_sorted_buckets(bucket_paths, output_path)
+        report(0.9, 1.0, "Done")(1.0)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return status_counts
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class ScratchFile:
+    """
+    A file for one streamed reconciliation input or result.
+
+    The file is deleted by release() or, failing that, when the object
+    is garbage collected along with the session state holding it.
+    """
+
+    def __init__(self, directory=None, prefix="reconciliation-"):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".csv", dir=directory)
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    @classmethod
+    def spool(cls, source, directory=None, prefix="upload-"):
+        """Copy a file-like object, such as an upload, to a new scratch file"""
+        scratch = cls(directory, prefix)
+        try:
+            source.seek(0)
+            with open(scratch.path, "wb") as f:
+                shutil.copyfileobj(source, f)
+        except Exception:
+            scratch.release()
+            raise
+        return scratch
+
+    def release(self):
+        self._finalizer()
+
+def read_results(path, status=None, limit=1000, chunksize=DEFAULT_CHUNKSIZE):
+    """Read up to ``limit`` rows of a streamed result file, optionally for one status"""
+    preview = []
+    remaining = limit
+    for chunk in pd.read_csv(path, dtype={'Transaction_ID': 'Int64'}, chunksize=chunksize,
+                             float_precision="round_trip"):
+        if status is not None:
+            chunk = chunk[chunk['Reconciliation_Status'] == status]
+        preview.append(chunk.head(remaining))
+        remaining -= len(preview[-1])
+        if remaining <= 0:
+            break
+    result = pd.concat(preview, ignore_index=True) if preview else pd.DataFrame(columns=RESULT_COLUMNS)
+    result['Reconciliation_Status'] = result['Reconciliation_Status'].astype(STATUS_DTYPE)
+    return result
@@ -0,0 +1,185 @@
+"""
+Process-wide registry of loaded datasets shared by every page and session.
+
+Datasets are keyed by their ingest key (a content hash), so the same
+extract uploaded by many users is held in memory once. Sessions hold
+reference-counted handles; unreferenced datasets stay cached until the
+memory ceiling forces least-recently-used eviction.
+"""
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(os.getenv("BANKTECH_REGISTRY_MAX_MB", "2048")) * 1024 * 1024
+
+def estimate_nbytes(obj):
+    """Best-effort size in bytes of a dataset or something derived from it"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+class _Entry:
+    def __init__(self, df):
+        self.df = df
+        self.refcount = 0
+        self.nbytes = estimate_nbytes(df)
+        # Indexes and other structures built once per dataset, keyed by name
+        self.derived = {}
+
+class DatasetHandle:
+    """
+    A session's reference to a registry dataset.
+
+    The reference is released by release() or, failing that, when the
+    handle is garbage collected along with the session state holding it.
+    """
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+        self._finalizer = weakref.finalize(self, registry.release, key)
+
+    @property
+    def df(self):
+        return self.registry.get(self.key)
+
+    def derived(self, name, builder):
+        """Return a structure computed once per dataset by ``builder(df)``"""
+        return self.registry.derived(self.key, name, builder)
+
+    def cached(self, name):
+        """Return the derived structure ``name`` if it has been built, else None"""
+        return self.registry.cached(self.key, name)
+
+    def release(self):
+        self._finalizer()
+
+class DatasetRegistry:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        # One lock per key being loaded so concurrent sessions load a file once
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, key, loader):
+        """
+        Return a handle to dataset ``key``, calling ``loader()`` if it isn't loaded.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                load_lock = self._load_locks.setdefault(key, threading.Lock())
+            else:
+                self._take(key, entry)
+                self.hits += 1
+                return DatasetHandle(self, key)
+
+        # Load outside the registry lock so other datasets stay available
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._take(key, entry)
+                    self.hits += 1
+                    return DatasetHandle(self, key)
+
+            df = loader()
+
+            with self._lock:
+                entry = _Entry(df)
+                self._entries[key] = entry
+                self._load_locks.pop(key, None)
+                self._take(key, entry)
+                self.misses += 1
+                self._evict()
+                return DatasetHandle(self, key)
+
+    def _take(self, key, entry):
+        entry.refcount += 1
+        self._entries.move_to_end(key)
+
+    def release(self, key):
+        """Drop one reference to ``key``; unreferenced datasets become evictable"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refcount > 0:
+                entry.refcount -= 1
+            self._evict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            return entry.df
+
+    def derived(self, key, name, builder):
+        """Return ``builder(df)`` for dataset ``key``, computing it only once"""
+        with self._lock:
+            entry = self._entries[key]
+            if name in entry.derived:
+                return entry.derived[name]
+            df = entry.df
+
+        value = builder(df)
+
+        with self._lock:
+            # Another session may have built it meanwhile; keep the first one
+            if name not in entry.derived:
+                entry.derived[name] = value
+                entry.nbytes += estimate_nbytes(value)
+                self._evict()
+            return entry.derived[name]
+
+    def cached(self, key, name):
+        with self._lock:
+            return self._entries[key].derived.get(name)
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def _evict(self):
+        # Oldest first; datasets still referenced by a session are never evicted
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refcount == 0:
+                total -= entry.nbytes
+                del self._entries[key]
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "referenced": sum(1 for entry in self._entries.values() if entry.refcount),
+                "bytes": sum(entry.nbytes for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# The registry shared by every page and session in this server process
+registry = DatasetRegistry()
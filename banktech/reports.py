@@ -0,0 +1,345 @@
+"""
+AI-generated customer reports.
+
+Reports are stored in an on-disk cache keyed by customer and a hash of
+the statistics they describe, so reruns, "Hide Report" and other
+sessions reuse a report instead of calling the model again. Concurrent
+requests for the same report share a single model call.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import streamlit as st
+
+from banktech.aggregates import CustomerAggregates
+from banktech.ingest import CACHE_DIR
+from banktech.lazy import lazy_import
+from banktech.text import normalize_report
+
+# Only imported once a report is generated; google.generativeai alone takes seconds on a cold start
+genai = lazy_import("google.generativeai")
+dotenv = lazy_import("dotenv")
+
+MODEL_NAME = "gemini-1.5-pro"
+
+# Set BANKTECH_REPORT_MODEL=stub to generate reports offline, e.g. in tests
+REPORT_MODEL = os.getenv("BANKTECH_REPORT_MODEL", "gemini")
+
+REPORT_CACHE_PATH = os.path.join(CACHE_DIR, "reports.sqlite")
+REPORT_TTL_SECONDS = float(os.getenv("BANKTECH_REPORT_TTL_HOURS", "24")) * 3600
+REPORT_CACHE_SIZE = int(os.getenv("BANKTECH_REPORT_CACHE_SIZE", "1000"))
+# A cache hit records its read time only if the last one is older than this, so
+# reruns that show the same report don't write to the database every time
+REPORT_ACCESS_INTERVAL_SECONDS = 60
+
+class ReportError(Exception):
+    """Raised when a report can't be generated"""
+
+def build_prompt(customer_name, stats):
+    """Create a prompt for the AI with explicit formatting instructions"""
+    return f"""
+        Generate a structured banking analysis report for customer {customer_name} based on the following transaction data:
+
+        - Total Transactions: {stats['total_transactions']}
+        - Total Transaction Amount: ₹{int(stats['total_amount'])}
+        - Average Transaction Amount: ₹{int(stats['avg_amount'])}
+        - Maximum Transaction Amount: ₹{int(stats['max_transaction'])}
+        - Credit Transactions: {stats['credit_count']} totaling ₹{int(stats['credit_sum'])}
+        - Debit Transactions: {stats['debit_count']} totaling ₹{int(stats['debit_sum'])}
+        - Net Balance: ₹{int(stats['net_balance'])}
+        - Transaction Locations: {stats['locations']}
+
+        IMPORTANT FORMATTING RULES:
+        1. Use the ₹ symbol for all currency values
+        2. Always include spaces between numbers and words
+        3. Do NOT run words together
+        4. For example, write "over the analyzed period" NOT "overtheanalyzedperiod"
+        5. Write "compared to 1 credit transaction of" NOT "comparedto1credittransactionof"
+        6. Write "The average transaction amount is" NOT "Theaverage..."
+
+        Please organize your report in this exact format with numbering:
+
+        ## Banking Analysis Report for {customer_name}
+
+        #### 1. Summary:
+        [Write summary here with proper spacing between numbers and words]
+
+        #### 2. Spending Habits & Financial Behavior:
+        [Write analysis here with proper spacing between numbers and words]
+
+        #### 3. Loan Recommendations:
+        [Write recommendations here with proper spacing between numbers and words]
+
+        #### 4. Notable Patterns:
+        [Write patterns here with proper spacing between numbers and words]
+        """
+
+class ReportModel:
+    """
+    Interface of the models that write reports.
+
+    Implementations set ``name`` and implement ``stream(prompt)``, which
+    yields the report text in pieces as the model produces it.
+    """
+
+    name = None
+
+    def stream(self, prompt):
+        raise NotImplementedError
+
+    def generate(self, prompt):
+        return "".join(self.stream(prompt))
+
+class GeminiModel(ReportModel):
+    """Google Gemini report model"""
+
+    def __init__(self, api_key, model_name=MODEL_NAME):
+        genai.configure(api_key=api_key)
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def stream(self, prompt):
+        for chunk in self.model.generate_content(prompt, stream=True):
+            yield chunk.text
+
+class StubModel(ReportModel):
+    """Offline stand-in for Gemini that writes a fixed report from the prompt's figures"""
+
+    name = "stub"
+
+    def __init__(self, delay=0.0):
+        # Seconds to wait between streamed words, to mimic a real model
+        self.delay = delay
+
+    def stream(self, prompt):
+        title = re.search(r"^\s*(## .+)$", prompt, re.MULTILINE)
+        figures = [line.strip() for line in prompt.splitlines() if line.strip().startswith("- ")]
+        report = "\n\n".join([
+            title.group(1) if title else "## Banking Analysis Report",
+            "#### 1. Summary:",
+            "\n".join(figures),
+            "#### 2. Spending Habits & Financial Behavior:",
+            "Generated offline by the stub report model.",
+            "#### 3. Loan Recommendations:",
+            "Generated offline by the stub report model.",
+            "#### 4. Notable Patterns:",
+            "Generated offline by the stub report model.",
+        ])
+        for word in re.findall(r"\s*\S+", report):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word
+
+_model = None
+_model_lock = threading.Lock()
+
+def _create_model():
+    if REPORT_MODEL == "stub":
+        return StubModel()
+
+    # Load environment variables
+    dotenv.load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    # If not found in environment, try to get from Streamlit secrets
+    if not api_key:
+        try:
+            api_key = st.secrets["GEMINI_API_KEY"]
+        except Exception:
+            raise ReportError("API key not found. Please add it to Streamlit secrets or environment variables.")
+    return GeminiModel(api_key)
+
+def get_model():
+    """Return the report model, configuring it on first use"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = _create_model()
+        return _model
+
+class ReportCache:
+    """
+    SQLite-backed report cache shared by every session and server process.
+
+    Entries expire ``ttl`` seconds after they are written; beyond
+    ``max_entries``, the least recently read entries are evicted. Read
+    times are only recorded to within ``access_interval`` seconds.
+    """
+
+    def __init__(self, path=REPORT_CACHE_PATH, ttl=REPORT_TTL_SECONDS, max_entries=REPORT_CACHE_SIZE,
+                 access_interval=REPORT_ACCESS_INTERVAL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.access_interval = access_interval
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS reports ("
+                    " key TEXT PRIMARY KEY, customer TEXT, report TEXT NOT NULL,"
+                    " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+            self._initialized = True
+        return connection
+
+    def get(self, key):
+        """Return the cached report for ``key``, or None if missing or expired"""
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT report, created_at, accessed_at FROM reports WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            report, created_at, accessed_at = row
+            if now - created_at > self.ttl:
+                connection.execute("DELETE FROM reports WHERE key = ?", (key,))
+                return None
+            if now - accessed_at >= self.access_interval:
+                connection.execute("UPDATE reports SET accessed_at = ? WHERE key = ?", (now, key))
+            return report
+
+    def put(self, key, customer, report):
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)",
+                (key, str(customer), report, now, now)
+            )
+            connection.execute("DELETE FROM reports WHERE created_at < ?", (now - self.ttl,))
+            connection.execute(
+                "DELETE FROM reports WHERE key IN"
+                " (SELECT key FROM reports ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM reports")
+
+# The report cache shared by every page and session
+report_cache = ReportCache()
+
+def report_key(customer, stats, model_name):
+    """Return the cache key of a customer's report on the given statistics"""
+    payload = json.dumps({"customer": str(customer), "stats": stats, "model": model_name}, sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+class ReportJob:
+    """
+    A report being generated on a background thread.
+
+    ``text`` grows as the model streams its answer; once ``done``, it
+    holds the finished report or an error message.
+    """
+
+    def __init__(self, key=None, customer=None, customer_name=None, stats=None, model=None, cache=None):
+        self.key = key
+        self.customer = customer
+        self.customer_name = customer_name
+        self.stats = stats
+        self.model = model
+        self.cache = cache
+        self.failed = False
+        self._chunks = []
+        self._report = None
+        self._done = threading.Event()
+
+    @classmethod
+    def finished(cls, report, failed=False):
+        """Return a job that is already done with ``report``"""
+        job = cls()
+        job._report = report
+        job.failed = failed
+        job._done.set()
+        return job
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"report-{self.key}", daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            for chunk in self.model.stream(build_prompt(self.customer_name, self.stats)):
+                self._chunks.append(chunk)
+            report = normalize_report("".join(self._chunks))
+            self.cache.put(self.key, self.customer, report)
+            self._report = report
+        except Exception as e:
+            self.failed = True
+            self._report = f"AI report generation failed: {str(e)}"
+        finally:
+            with _jobs_lock:
+                if _jobs.get(self.key) is self:
+                    del _jobs[self.key]
+            self._done.set()
+
+    @property
+    def text(self):
+        if self._report is not None:
+            return self._report
+        return normalize_report("".join(self._chunks))
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait until the report is finished; return whether it is"""
+        return self._done.wait(timeout)
+
+    def result(self):
+        self.wait()
+        return self.text
+
+# Reports being generated right now, so concurrent requests share one model call
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def start_report(stats, customer_name, customer_id=None, model=None, cache=None):
+    """
+    Return a ReportJob for the customer's report on ``stats``, as given by CustomerAggregates.stats().
+
+    A cached report is returned as a finished job; otherwise the report
+    is generated on a background thread, and a request for a report
+    already being generated joins that job.
+    """
+    try:
+        model = model or get_model()
+        cache = cache or report_cache
+        customer = customer_id if customer_id is not None else customer_name
+        key = report_key(customer, stats, model.name)
+
+        report = cache.get(key)
+        if report is not None:
+            return ReportJob.finished(report)
+
+        with _jobs_lock:
+            job = _jobs.get(key)
+            if job is None:
+                job = _jobs[key] = ReportJob(key, customer, customer_name, stats, model, cache).start()
+        return job
+
+    except Exception as e:
+        return ReportJob.finished(f"AI report generation failed: {str(e)}", failed=True)
+
+def generate_ai_report(df, customer_name, customer_id=None, model=None, cache=None):
+    """
+    Generate an AI report using Google's Gemini model based on transaction data
+
+    The report is served from the report cache when the customer's
+    statistics haven't changed; failures are returned as the report text
+    and are not cached.
+    """
+    return start_report(CustomerAggregates(df).stats(), customer_name, customer_id, model, cache).result()
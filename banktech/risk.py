@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+# Score bands for the batch scorer, mirroring the if/elif chains in
+# calculate_risk_score. Each entry is (threshold, points); the first band
+# whose threshold is met wins.
+CREDIT_SCORE_POINTS = [(750, 40), (700, 30), (650, 20), (600, 10)]
+INCOME_POINTS = [(100000, 25), (75000, 20), (50000, 15), (30000, 10)]
+INCOME_FLOOR_POINTS = 5
+# Utilization bands are upper bounds: lower utilization scores higher
+UTILIZATION_POINTS = [(0.1, 15), (0.3, 12), (0.5, 8), (0.7, 4)]
+NO_DEFAULT_POINTS = 20
+
+RISK_CATEGORIES = [(80, "Low Risk"), (60, "Medium Risk")]
+CREDIT_SCORE_CATEGORIES = [(750, "Excellent"), (700, "Good"), (650, "Fair"), (600, "Poor")]
+
+def calculate_risk_score(customer):
+    """Calculate a risk score based on customer data"""
+    score = 0
+
+    # Credit score factor (max 40 points)
+    if customer['Credit_Score'] >= 750:
+        score += 40
+    elif customer['Credit_Score'] >= 700:
+        score += 30
+    elif customer['Credit_Score'] >= 650:
+        score += 20
+    elif customer['Credit_Score'] >= 600:
+        score += 10
+
+    # Income factor (max 25 points)
+    if customer['Income'] >= 100000:
+        score += 25
+    elif customer['Income'] >= 75000:
+        score += 20
+    elif customer['Income'] >= 50000:
+        score += 15
+    elif customer['Income'] >= 30000:
+        score += 10
+    else:
+        score += 5
+
+    # Credit utilization (max 15 points)
+    credit_util = customer['Credit_Utilization']
+    if credit_util <= 0.1:
+        score += 15
+    elif credit_util <= 0.3:
+        score += 12
+    elif credit_util <= 0.5:
+        score += 8
+    elif credit_util <= 0.7:
+        score += 4
+
+    # Default history (max 20 points)
+    if customer['Default_History'] == 'No':
+        score += 20
+
+    return score
+
+def get_risk_category(score):
+    """Get risk category and styling based on score"""
+    if score >= 80:
+        return "Low Risk", "risk-low", "low-risk-tag"
+    elif score >= 60:
+        return "Medium Risk", "risk-medium", "medium-risk-tag"
+    else:
+        return "High Risk", "risk-high", "high-risk-tag"
+
+def get_credit_score_category(score):
+    """Get credit score category and styling"""
+    if score >= 750:
+        return "Excellent", "risk-low"
+    elif score >= 700:
+        return "Good", "risk-low"
+    elif score >= 650:
+        return "Fair", "risk-medium"
+    elif score >= 600:
+        return "Poor", "risk-medium"
+    else:
+        return "Very Poor", "risk-high"
+
+def _as_float_array(series):
+    """Return a column as a float array with missing values as NaN"""
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def _band_at_least(values, bands, default):
+    # NaN compares False everywhere, so it falls through to the default
+    # exactly like the if/elif chain in calculate_risk_score
+    return np.select([values >= threshold for threshold, _ in bands],
+                     [points for _, points in bands], default)
+
+def _band_at_most(values, bands, default):
+    return np.select([values <= threshold for threshold, _ in bands],
+                     [points for _, points in bands], default)
+
+def score_customers(customers):
+    """
+    Score a whole customer portfolio in one vectorized pass.
+
+    Returns a DataFrame aligned to ``customers.index`` with the same
+    values calculate_risk_score, get_risk_category and
+    get_credit_score_category produce row by row, plus the default
+    probability and recommended maximum loan shown on the risk page.
+    """
+    credit_score = _as_float_array(customers['Credit_Score'])
+    income = _as_float_array(customers['Income'])
+    credit_util = _as_float_array(customers['Credit_Utilization'])
+    no_default = customers['Default_History'].eq('No').to_numpy(dtype=bool, na_value=False)
+
+    score = (
+        _band_at_least(credit_score, CREDIT_SCORE_POINTS, 0)
+        + _band_at_least(income, INCOME_POINTS, INCOME_FLOOR_POINTS)
+        + _band_at_most(credit_util, UTILIZATION_POINTS, 0)
+        + np.where(no_default, NO_DEFAULT_POINTS, 0)
+    ).astype(np.int64)
+
+    risk_category = _band_at_least(score, RISK_CATEGORIES, "High Risk")
+    credit_category = _band_at_least(credit_score, CREDIT_SCORE_CATEGORIES, "Very Poor")
+
+    # np.round rounds half to even, the same as the built-in round()
+    max_loan = np.round((score / 100) * income * 3)
+    if not np.isnan(max_loan).any():
+        max_loan = max_loan.astype(np.int64)
+
+    return pd.DataFrame({
+        'Risk_Score': score,
+        'Risk_Category': risk_category,
+        'Credit_Score_Category': credit_category,
+        'Default_Probability': 100 - score,
+        'Max_Loan': max_loan,
+    }, index=customers.index)
@@ -0,0 +1,24 @@
+import streamlit as st
+
+from banktech.ingest import ingest_csv, open_dataset
+from banktech.registry import registry
+
+def use_dataset(slot, uploaded_file=None, schema="transactions"):
+    """
+    Return this session's DatasetHandle for ``slot``, or None.
+
+    Slots are shared by all pages in the session, so a transaction file
+    uploaded on one page is available on the others without another
+    upload. Passing a new upload switches the slot to that file.
+    """
+    handles = st.session_state.setdefault("dataset_handles", {})
+
+    if uploaded_file is not None:
+        key = ingest_csv(uploaded_file, schema)
+        current = handles.get(slot)
+        if current is None or current.key != key:
+            handles[slot] = registry.acquire(key, lambda: open_dataset(key))
+            if current is not None:
+                current.release()
+
+    return handles.get(slot)
@@ -0,0 +1,140 @@
+"""
+Server-side paginated tables.
+
+Sorting and filtering work on row positions, and only the rows of the
+visible page are sliced out of the frame, styled and sent to the
+browser, so a 200k-row file costs one page of serialization per rerun.
+"""
+from math import ceil
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+def page_bounds(page, rows_per_page=100):
+    """Return the start and end row of a 1-based page"""
+    start_idx = (page - 1) * rows_per_page
+    return start_idx, start_idx + rows_per_page
+
+def paginate_data(df, page, rows_per_page=100):
+    """
+    Return a slice of the dataframe, or of an array of row positions, for the current page
+    """
+    start_idx, end_idx = page_bounds(page, rows_per_page)
+    if isinstance(df, np.ndarray):
+        return df[start_idx:end_idx]
+    return df.iloc[start_idx:end_idx]
+
+def sort_order(df, column, ascending=True, dataset=None):
+    """
+    Return the row positions of ``df`` ordered by ``column``.
+
+    Matches ``df.sort_values(column, kind="stable")`` (missing values
+    last). The order is computed once per dataset when ``df`` is the
+    frame of a registry ``dataset``.
+    """
+    def build(frame):
+        values = frame[column].reset_index(drop=True)
+        return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+    if dataset is not None:
+        return dataset.derived(_sort_order_name(column, ascending), build)
+    return build(df)
+
+def _sort_order_name(column, ascending):
+    return f"sort_order:{column}:{'asc' if ascending else 'desc'}"
+
+def top_k_order(values, k, ascending=True):
+    """
+    Return the positions of the first ``k`` values in stable sort order, or None.
+
+    Selects with a partition instead of sorting every value: everything
+    below the k-th smallest value, then the earliest rows tied with it.
+    Returns None when that can't reproduce the full sort (missing values
+    reach the top k), so the caller can sort fully instead.
+    """
+    values = np.asarray(values, dtype=float)
+    if not ascending:
+        values = -values
+    if k >= len(values):
+        return None
+
+    threshold = np.partition(values, k - 1)[k - 1]
+    if np.isnan(threshold):
+        return None
+
+    below = np.flatnonzero(values < threshold)
+    tied = np.flatnonzero(values == threshold)[:k - len(below)]
+    top = np.concatenate([below, tied])
+    return top[np.argsort(values[top], kind="stable")]
+
+def ordered_rows(df, rows=None, sort_by=None, ascending=True, dataset=None, limit=None):
+    """
+    Return the row positions to display: ``rows`` (all rows if None) in sort order.
+
+    A filtered view is intersected with the full sort order rather than
+    sorted again. With ``limit``, only the first ``limit`` positions are
+    needed: unless the full order is already cached, a view of at most
+    ``limit`` rows is sorted on its own, numeric columns of larger views
+    use a partial sort, and the full sort is left for deeper pages.
+    """
+    if sort_by is None:
+        return np.arange(len(df)) if rows is None else np.asarray(rows)
+
+    cached = dataset.cached(_sort_order_name(sort_by, ascending)) if dataset is not None else None
+    if limit is not None and cached is None and rows is not None and len(rows) <= limit:
+        # Small filtered views, such as an ID search: sort just these rows, in row order for ties
+        candidates = np.sort(rows)
+        values = df[sort_by].iloc[candidates].reset_index(drop=True)
+        return candidates[values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()]
+    if limit is not None and cached is None and pd.api.types.is_numeric_dtype(df[sort_by]):
+        # Ties are broken by row order, as in the full stable sort
+        candidates = np.arange(len(df)) if rows is None else np.sort(rows)
+        top = top_k_order(df[sort_by].to_numpy(dtype=float, na_value=np.nan)[candidates], limit, ascending)
+        if top is not None:
+            return candidates[top]
+
+    order = cached if cached is not None else sort_order(df, sort_by, ascending, dataset)
+    if rows is None:
+        return order
+    keep = np.zeros(len(df), dtype=bool)
+    keep[rows] = True
+    return order[keep[order]]
+
+def paged_table(df, key, rows=None, sort_columns=None, dataset=None, rows_per_page=100, style=None, **dataframe_kwargs):
+    """
+    Show ``df`` one page at a time with sort and page controls.
+
+    ``rows`` restricts the table to those row positions, ``sort_columns``
+    lists the columns offered for sorting and ``style`` turns the page
+    into a Styler. Extra keyword arguments go to ``st.dataframe``.
+    """
+    sort_by, ascending = None, True
+    if sort_columns is not None:
+        sort_col1, sort_col2 = st.columns([3, 1])
+        with sort_col1:
+            sort_by = st.selectbox("Sort by", options=[None] + list(sort_columns),
+                                   format_func=lambda column: "Original order" if column is None else column,
+                                   key=f"{key}_sort_by")
+        with sort_col2:
+            ascending = st.radio("Order", options=["Ascending", "Descending"], horizontal=True,
+                                 key=f"{key}_order") == "Ascending"
+
+    positions = ordered_rows(df, rows, sort_by, ascending, dataset)
+    total_pages = max(1, ceil(len(positions) / rows_per_page))
+
+    # Keep the page valid when a new filter leaves fewer pages
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+
+    page = st.session_state.get(page_key, 1)
+    page_df = df.iloc[paginate_data(positions, page, rows_per_page)]
+
+    st.dataframe(style(page_df) if style is not None else page_df, **dataframe_kwargs)
+
+    page_col1, page_col2 = st.columns([1, 3])
+    with page_col1:
+        st.number_input("Page", min_value=1, max_value=total_pages, step=1, key=page_key)
+    with page_col2:
+        st.caption(f"Page {page} of {total_pages} ({len(positions)} records)")
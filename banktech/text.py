@@ -0,0 +1,35 @@
+"""
+Clean-up of AI-generated report text.
+
+The fixes are the original post-processing steps, run in the same order
+with the same patterns, so every report comes out exactly as before.
+The patterns are compiled once at import rather than on every call, and
+the digit rule inserts a space instead of rewriting the digits around it.
+"""
+import re
+
+# A digit followed by a letter ("5transactions") gets a space between them
+_DIGIT_LETTER = re.compile(r"(?<=\d)(?=[a-zA-Z])")
+
+# Phrases the model runs together, matched ignoring case and spacing, in the order they're fixed.
+# "of ₹" runs before "balance of", so "balanceof₹" ends up as "balance of ₹".
+_REPORT_PHRASES = [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in [
+        (r"over\s*the\s*analyzed\s*period", "over the analyzed period"),
+        (r"The\s*average", "The average"),
+        (r"compared\s*to", "compared to"),
+        (r"resulting\s*in", "resulting in"),
+        (r"indicates\s*a", "indicates a"),
+        (r"with\s*an", "with an"),
+        (r"of\s*₹", "of ₹"),
+        (r"balance\s*of", "balance of"),
+    ]
+]
+
+def normalize_report(text):
+    """Fix the spacing issues the model leaves in a report"""
+    text = _DIGIT_LETTER.sub(" ", text)
+    for pattern, replacement in _REPORT_PHRASES:
+        text = pattern.sub(replacement, text)
+    return text
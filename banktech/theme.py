@@ -0,0 +1,47 @@
+"""
+The stylesheet shared by Home and every page.
+
+All styles live in static/theme.css. With Streamlit's static file
+serving on (server.enableStaticServing, set in .streamlit/config.toml),
+a rerun only sends a <link> to that file, which the browser fetches once
+and then serves from its cache. Without it, the stylesheet is minified
+once per process and sent inline.
+"""
+import hashlib
+import os
+import re
+import threading
+
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THEME_PATH = os.path.join(ROOT, "static", "theme.css")
+# Where Streamlit serves files from the app's static/ folder
+THEME_URL = "app/static/theme.css"
+
+_theme = None
+_theme_lock = threading.Lock()
+
+def _minify(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).replace(";}", "}").strip()
+
+def _load_theme():
+    """Return the minified stylesheet and a short hash of it, read once per process"""
+    global _theme
+    with _theme_lock:
+        if _theme is None:
+            with open(THEME_PATH, encoding="utf-8") as f:
+                css = _minify(f.read())
+            _theme = css, hashlib.blake2b(css.encode("utf-8"), digest_size=6).hexdigest()
+        return _theme
+
+def apply_theme():
+    """Style the current page with the shared stylesheet"""
+    css, version = _load_theme()
+    if st.get_option("server.enableStaticServing"):
+        # The version changes with the stylesheet, so browsers never keep a stale copy
+        st.markdown(f'<link rel="stylesheet" href="{THEME_URL}?v={version}">', unsafe_allow_html=True)
+    else:
+        st.html(f"<style>{css}</style>")
@@ -0,0 +1,133 @@
+"""
+Validation of salary files before disbursement.
+
+Every rule is a vectorized operation over a whole column that yields a
+boolean mask of offending rows; the masks are then combined into one
+per-row report. Errors block a row from being paid; warnings (salary
+outliers) are only flagged for review.
+"""
+import numpy as np
+import pandas as pd
+
+SALARY_COLUMNS = ["Employee ID", "Employee Name", "Bank Account Number", "IFSC Code", "Salary Amount (INR)"]
+
+# Four letters for the bank, a reserved zero, then six characters for the branch
+IFSC_PATTERN = r"[A-Z]{4}0[A-Z0-9]{6}"
+ACCOUNT_NUMBER_PATTERN = r"\d{9,18}"
+# Modified z-score above which a salary is flagged as an outlier (Iglewicz and Hoaglin)
+OUTLIER_Z_SCORE = 3.5
+
+ERROR = "Error"
+WARNING = "Warning"
+
+def _missing(values):
+    """Rows with no value, or only whitespace"""
+    missing = values.isna().to_numpy()
+    if values.dtype == float:
+        return missing
+    return missing | values.astype(str).str.strip().eq("").to_numpy(dtype=bool, na_value=False)
+
+def _not_matching(values, pattern):
+    """Rows with a value that doesn't match ``pattern`` in full"""
+    matches = values.astype(str).str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False)
+    return ~matches & ~values.isna().to_numpy()
+
+def _outliers(amounts):
+    """Rows whose amount is far from the median, by the modified z-score"""
+    finite = amounts[np.isfinite(amounts)]
+    if len(finite) == 0:
+        return np.zeros(len(amounts), dtype=bool)
+    median = np.median(finite)
+    mad = np.median(np.abs(finite - median))
+    if mad == 0:
+        return np.zeros(len(amounts), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        return 0.6745 * np.abs(amounts - median) / mad > OUTLIER_Z_SCORE
+
+class ValidationResult:
+    """
+    Outcome of validating a salary file.
+
+    ``report`` has one row per problem found: the data row, Employee ID,
+    column, issue and severity. ``errors`` and ``warnings`` are boolean
+    masks over the file's rows. ``missing_columns`` lists required
+    columns the file lacks; when there are any, no row was checked.
+    """
+
+    def __init__(self, report, errors, warnings, missing_columns=()):
+        self.report = report
+        self.errors = errors
+        self.warnings = warnings
+        self.missing_columns = list(missing_columns)
+
+    @property
+    def valid(self):
+        """True when no row has an error"""
+        return not self.errors.any()
+
+    def counts(self):
+        """Number of rows per issue, most frequent first"""
+        return self.report.groupby(["Severity", "Issue"], observed=True).size().sort_values(ascending=False)
+
+def validate_salary(df):
+    """Check every row of a salary DataFrame; return a ValidationResult"""
+    missing_columns = [column for column in SALARY_COLUMNS if column not in df.columns]
+    if missing_columns:
+        report = pd.DataFrame({
+            "Row": pd.array([pd.NA] * len(missing_columns), dtype="Int64"),
+            "Employee ID": pd.NA,
+            "Column": missing_columns,
+            "Issue": "Column missing from file",
+            "Severity": ERROR,
+        })
+        return ValidationResult(report, np.ones(len(df), dtype=bool), np.zeros(len(df), dtype=bool),
+                                missing_columns)
+
+    employee_ids = df["Employee ID"]
+    amounts = df["Salary Amount (INR)"].to_numpy(dtype=float, na_value=np.nan)
+    missing_ids = _missing(employee_ids)
+    missing_amounts = np.isnan(amounts)
+
+    # (column, issue, severity, mask of offending rows)
+    rules = [
+        ("Employee ID", "Missing employee ID", ERROR, missing_ids),
+        ("Employee ID", "Duplicate employee ID", ERROR,
+         employee_ids.duplicated(keep=False).to_numpy() & ~missing_ids),
+        ("Employee Name", "Missing name", ERROR, _missing(df["Employee Name"])),
+        ("Bank Account Number", "Missing account number", ERROR, _missing(df["Bank Account Number"])),
+        ("Bank Account Number", "Account number must be 9 to 18 digits", ERROR,
+         _not_matching(df["Bank Account Number"], ACCOUNT_NUMBER_PATTERN)),
+        ("IFSC Code", "Missing IFSC code", ERROR, _missing(df["IFSC Code"])),
+        ("IFSC Code", "IFSC code must be 4 letters, 0, then 6 letters or digits", ERROR,
+         _not_matching(df["IFSC Code"], IFSC_PATTERN)),
+        ("Salary Amount (INR)", "Missing salary", ERROR, missing_amounts),
+        ("Salary Amount (INR)", "Salary must be positive", ERROR, amounts <= 0),
+        ("Salary Amount (INR)", "Salary is an outlier", WARNING, _outliers(amounts) & (amounts > 0)),
+    ]
+
+    # One report row per (row, rule) hit, built from the masks without a Python loop over rows
+    hit_rows = [np.flatnonzero(mask) for *_, mask in rules]
+    rule_ids = np.repeat(np.arange(len(rules)), [len(rows) for rows in hit_rows])
+    rows = np.concatenate(hit_rows)
+    order = np.lexsort((rule_ids, rows))
+    rows, rule_ids = rows[order], rule_ids[order]
+
+    columns, issues, severities, _ = zip(*rules)
+    report = pd.DataFrame({
+        # 1-based data rows, not counting the header; a CSV line can differ
+        # when a quoted value spans lines or blank lines are skipped
+        "Row": rows + 1,
+        "Employee ID": employee_ids.to_numpy()[rows],
+        "Column": np.array(columns, dtype=object)[rule_ids],
+        "Issue": np.array(issues, dtype=object)[rule_ids],
+        "Severity": np.array(severities, dtype=object)[rule_ids],
+    })
+
+    errors = np.zeros(len(df), dtype=bool)
+    warnings = np.zeros(len(df), dtype=bool)
+    for *_, severity, mask in rules:
+        if severity == ERROR:
+            errors |= mask
+        else:
+            warnings |= mask
+    return ValidationResult(report, errors, warnings)
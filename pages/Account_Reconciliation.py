@@ -1,8 +1,19 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
+import os
+
+from banktech.figures import cached_figure
+from banktech.ingest import CACHE_DIR
+from banktech.lazy import lazy_import
+from banktech.reconciliation import DEFAULT_ATOL, DEFAULT_RTOL, ScratchFile, read_results, reconcile, reconcile_chunked, reconcile_parallel, summarize
+from banktech.registry import registry
+from banktech.session import use_dataset
+from banktech.table import paged_table
+from banktech.theme import apply_theme
+
+# Plotly is only imported when the status chart is first drawn
+px = lazy_import("plotly.express")
 
 # Page Configuration
 st.set_page_config(
@@ -11,129 +22,112 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for styling
-def load_css():
-    st.markdown("""
-    <style>
-        /* General styling */
-        .main {
-            background-color: #f9f9f9;
-        }
-        
-        /* Header styling */
-        .header-container {
-            background-color: #1e3a8a;
-            padding: 1.5rem;
-            border-radius: 0.5rem;
-            color: white;
-            margin-bottom: 1rem;
-        }
-        
-        /* Card styling */
-        .card {
-            background-color: white;
-            border-radius: 0.5rem;
-            padding: 1.5rem;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            margin-bottom: 1rem;
-        }
-        
-        /* Button styling */
-        .stButton>button {
-            background-color: #1e3a8a;
-            color: white;
-            border: none;
-            border-radius: 0.25rem;
-            padding: 0.5rem 1rem;
-            font-weight: 500;
-        }
-        
-        .stButton>button:hover {
-            background-color: #2d4eaa;
-        }
+# Shared stylesheet, cached by the browser
+apply_theme()
 
-        /* Table styling */
-        .stDataFrame {
-            border: 1px solid #e2e8f0;
-            border-radius: 0.5rem;
-            overflow: hidden;
-        }
-        
-        /* Success message */
-        .success-message {
-            background-color: #d1fae5;
-            border-left: 4px solid #10b981;
-            padding: 1rem;
-            border-radius: 0.25rem;
-            margin: 1rem 0;
-        }
-        
-        /* Error message */
-        .error-message {
-            background-color: #fee2e2;
-            border-left: 4px solid #ef4444;
-            padding: 1rem;
-            border-radius: 0.25rem;
-            margin: 1rem 0;
-        }
-        
-        /* File upload styling */
-        .upload-container {
-            background-color: #f3f4f6;
-            border: 2px dashed #d1d5db;
-            border-radius: 0.5rem;
-            padding: 2rem;
-            text-align: center;
-            margin-bottom: 1rem;
-        }
-        
-        /* Status indicator styling */
-        .status-matched {
-            background-color: #d1fae5;
-            color: #047857;
-            padding: 0.25rem 0.5rem;
-            border-radius: 0.25rem;
-            font-weight: 500;
-        }
-        
-        .status-unmatched {
-            background-color: #fee2e2;
-            color: #b91c1c;
-            padding: 0.25rem 0.5rem;
-            border-radius: 0.25rem;
-            font-weight: 500;
-        }
-        
-        /* Summary card styling */
-        .summary-card {
-            padding: 1rem;
-            border-radius: 0.5rem;
-            text-align: center;
-            margin-bottom: 1rem;
-        }
-        
-        .summary-card h3 {
-            margin-top: 0;
-            font-size: 1.25rem;
-        }
-        
-        .summary-card p {
-            font-size: 2rem;
-            font-weight: bold;
-            margin: 0.5rem 0;
-        }
-        
-        .summary-matched {
-            background-color: #d1fae5;
-        }
-        
-        .summary-unmatched {
-            background-color: #fee2e2;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+RESULT_ROWS_PER_PAGE = 500
+# Spooled uploads and streamed results of low-memory mode, one of each per session at most
+RESULTS_DIR = os.path.join(CACHE_DIR, "reconciliation")
+STATUS_COLORS = {
+    'Matched': 'background-color: #d1fae5',
+    'Unmatched': 'background-color: #fee2e2'
+}
+
+def style_results_page(page_df):
+    """Format one page of reconciliation results for display"""
+    page_df = page_df.assign(Amount_Difference=page_df['Bank_Amount'] - page_df['Customer_Amount'])
+    
+    # Highlight whole rows by status, computed for the page at once
+    row_colors = page_df['Reconciliation_Status'].map(STATUS_COLORS).astype(object).fillna('').to_numpy()
+    colors = pd.DataFrame(np.repeat(row_colors[:, None], page_df.shape[1], axis=1),
+                          index=page_df.index, columns=page_df.columns)
+    
+    return (page_df.style
+            .format("₹{:,.2f}", subset=['Bank_Amount', 'Customer_Amount'], na_rep="Not Found")
+            .format("₹{:,.2f}", subset=['Amount_Difference'], na_rep="N/A")
+            .apply(lambda _: colors, axis=None))
+
+def status_chart(status_percentages):
+    """Donut chart of the share of matched and unmatched transactions"""
+    status_data = pd.DataFrame({
+        'Status': list(status_percentages.keys()),
+        'Percentage': [status_percentages[status]['percentage'] for status in status_percentages],
+        'Count': [status_percentages[status]['count'] for status in status_percentages]
+    })
+    
+    # Define colors for the chart
+    colors = {
+        'Matched': '#047857',  # Green
+        'Unmatched': '#b91c1c'  # Red
+    }
+    
+    fig = px.pie(
+        status_data, 
+        values='Percentage',
+        names='Status',
+        title='Reconciliation Status Distribution',
+        hole=0.5,
+        color='Status',
+        color_discrete_map=colors
+    )
+    
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label'
+    )
+    
+    fig.update_layout(
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5
+        )
+    )
+    
+    return fig
+
+def read_file(path):
+    """Return the bytes of a file, read when a download is requested"""
+    with open(path, "rb") as f:
+        return f.read()
+
+def store_results(results):
+    """Replace this session's reconciliation results, releasing the previous merged data or result file"""
+    previous = st.session_state.reconciliation_results
+    st.session_state.reconciliation_results = results
+    if previous is not None and previous['dataset'] is not None:
+        previous['dataset'].release()
+    if previous is not None and previous['result_file'] is not None:
+        previous['result_file'].release()
+
+def spool_stream_source(slot, uploaded_file):
+    """Copy an upload to disk once, keeping only the spooled file in session state"""
+    previous = st.session_state.stream_sources.get(slot)
+    if previous is not None and previous['file_id'] == uploaded_file.file_id:
+        return
+    st.session_state.stream_sources[slot] = {
+        'file_id': uploaded_file.file_id,
+        'file': ScratchFile.spool(uploaded_file, RESULTS_DIR, prefix=f"{slot}-"),
+    }
+    if previous is not None:
+        previous['file'].release()
+
+def stream_source_path(slot):
+    source = st.session_state.stream_sources.get(slot)
+    return source['file'].path if source is not None else None
 
-load_css()
+def reconcile_datasets(bank_ledger, customer_records, atol, rtol, workers):
+    """Return a registry handle to the reconciliation of two datasets, computed once for all sessions"""
+    def build():
+        # Merge on Transaction_ID and flag amounts (Transactions_Amount vs Transaction_Amount)
+        if workers > 1:
+            merged, _ = reconcile_parallel(bank_ledger.df, customer_records.df, workers, atol=atol, rtol=rtol)
+            return merged
+        return reconcile(bank_ledger.df, customer_records.df, atol=atol, rtol=rtol)
+    
+    return registry.acquire(f"reconciliation-{bank_ledger.key}-{customer_records.key}-{atol}-{rtol}", build)
 
 # Header
 st.markdown("""
@@ -144,14 +138,19 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Session State Initialization
-if 'bank_ledger' not in st.session_state:
-    st.session_state.bank_ledger = None
-if 'customer_records' not in st.session_state:
-    st.session_state.customer_records = None
 if 'reconciliation_results' not in st.session_state:
     st.session_state.reconciliation_results = None
 if 'comparison_done' not in st.session_state:
     st.session_state.comparison_done = False
+if 'stream_sources' not in st.session_state:
+    st.session_state.stream_sources = {}
+
+# Low-memory mode streams both ledgers from disk instead of loading them
+stream_mode = st.toggle(
+    "Low-memory mode for ledgers larger than RAM",
+    key="stream_mode",
+    help="Partitions both files on disk and reconciles them piece by piece"
+)
 
 # File Upload Section
 #st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -163,11 +162,16 @@ with col1:
     #st.markdown('<div class="upload-container">', unsafe_allow_html=True)
     st.subheader("Upload Bank Ledger")
     bank_ledger_file = st.file_uploader("Bank ledger file (CSV)", type=["csv"], key="bank_ledger_uploader")
-    if bank_ledger_file is not None:
+    if bank_ledger_file is not None and stream_mode:
+        try:
+            spool_stream_source('bank_ledger', bank_ledger_file)
+            st.success(f"Bank ledger file uploaded successfully ({bank_ledger_file.size / 1e6:,.1f} MB).")
+        except Exception as e:
+            st.error(f"Error reading file: {e}")
+    elif bank_ledger_file is not None:
         try:
-            bank_ledger = pd.read_csv(bank_ledger_file)
-            st.session_state.bank_ledger = bank_ledger
-            st.success(f"Bank ledger file uploaded successfully with {len(bank_ledger)} records.")
+            bank_ledger = use_dataset("bank_ledger", bank_ledger_file, schema="transactions")
+            st.success(f"Bank ledger file uploaded successfully with {len(bank_ledger.df)} records.")
         except Exception as e:
             st.error(f"Error reading file: {e}")
     st.markdown('</div>', unsafe_allow_html=True)
@@ -176,11 +180,16 @@ with col2:
     #st.markdown('<div class="upload-container">', unsafe_allow_html=True)
     st.subheader("Upload Customer Records")
     customer_records_file = st.file_uploader("Customer transaction records (CSV)", type=["csv"], key="customer_records_uploader")
-    if customer_records_file is not None:
+    if customer_records_file is not None and stream_mode:
         try:
-            customer_records = pd.read_csv(customer_records_file)
-            st.session_state.customer_records = customer_records
-            st.success(f"Customer records file uploaded successfully with {len(customer_records)} records.")
+            spool_stream_source('customer_records', customer_records_file)
+            st.success(f"Customer records file uploaded successfully ({customer_records_file.size / 1e6:,.1f} MB).")
+        except Exception as e:
+            st.error(f"Error reading file: {e}")
+    elif customer_records_file is not None:
+        try:
+            customer_records = use_dataset("customer_records", customer_records_file, schema="transactions")
+            st.success(f"Customer records file uploaded successfully with {len(customer_records.df)} records.")
         except Exception as e:
             st.error(f"Error reading file: {e}")
     st.markdown('</div>', unsafe_allow_html=True)
@@ -191,72 +200,101 @@ st.markdown('</div>', unsafe_allow_html=True)
 #st.markdown('<div class="card">', unsafe_allow_html=True)
 st.subheader("Reconciliation Process")
 
+# Datasets uploaded earlier in this session stay available across reruns and pages
+bank_ledger = use_dataset("bank_ledger")
+customer_records = use_dataset("customer_records")
+
+if stream_mode:
+    bank_source = stream_source_path('bank_ledger')
+    customer_source = stream_source_path('customer_records')
+    files_ready = bank_source is not None and customer_source is not None
+else:
+    files_ready = bank_ledger is not None and customer_records is not None
+
 # Check if both files are uploaded
-if st.session_state.bank_ledger is not None and st.session_state.customer_records is not None:
+if files_ready:
     st.write("Both files are uploaded. Click 'Compare Transactions' to start the reconciliation process.")
     
-    if st.button("Compare Transactions") or st.session_state.comparison_done:
-        st.session_state.comparison_done = True
-        
-        # Display a spinner while processing
-        with st.spinner("Comparing transactions..."):
-            # Get the dataframes
-            bank_df = st.session_state.bank_ledger
-            customer_df = st.session_state.customer_records
-            
-            # Prepare data for reconciliation - now using Transactions_Amount for comparison
-            bank_prepared = bank_df[['Transaction_ID', 'Transactions_Amount']].copy()
-            bank_prepared.columns = ['Transaction_ID', 'Bank_Amount']
-            
-            customer_prepared = customer_df[['Transaction_ID', 'Transaction_Amount']].copy()
-            customer_prepared.columns = ['Transaction_ID', 'Customer_Amount']
-            
-            # Merge the dataframes on Transaction_ID
-            merged = pd.merge(bank_prepared, customer_prepared, on='Transaction_ID', how='outer')
-            
-            # Determine if matched or unmatched based on amounts
-            def determine_status(row):
-                # If any amount is missing, it's unmatched
-                if pd.isna(row['Bank_Amount']) or pd.isna(row['Customer_Amount']):
-                    return "Unmatched"
-                # If amounts don't match, it's unmatched
-                elif row['Bank_Amount'] != row['Customer_Amount']:
-                    return "Unmatched"
-                # Otherwise, it's matched
-                else:
-                    return "Matched"
-            
-            # Apply the status function
-            merged['Reconciliation_Status'] = merged.apply(determine_status, axis=1)
-            
-            # Count statuses
-            status_counts = merged['Reconciliation_Status'].value_counts()
-            total_records = len(merged)
-            
-            # Calculate percentages
-            status_percentages = {}
-            for status in ['Matched', 'Unmatched']:
-                count = status_counts.get(status, 0)
-                percentage = (count / total_records) * 100 if total_records > 0 else 0
-                status_percentages[status] = {
-                    'count': count,
-                    'percentage': percentage
-                }
-            
-            # Save results to session state
-            st.session_state.reconciliation_results = {
-                'merged_data': merged,
+    # Amount tolerance, so float noise between the two ledgers isn't flagged
+    with st.expander("Matching tolerance"):
+        tol_col1, tol_col2 = st.columns(2)
+        with tol_col1:
+            atol = st.number_input("Absolute tolerance (₹)", min_value=0.0, value=DEFAULT_ATOL, step=0.005, format="%.3f")
+        with tol_col2:
+            rtol = st.number_input("Relative tolerance", min_value=0.0, value=DEFAULT_RTOL, step=1e-9, format="%.0e")
+        if not stream_mode:
+            workers = st.number_input(
+                "Parallel workers", min_value=1, max_value=os.cpu_count() or 1, value=1, step=1,
+                help="Reconcile very large ledgers on several CPU cores"
+            )
+    
+    compare_clicked = st.button("Compare Transactions")
+    
+    if stream_mode and compare_clicked:
+        # Stream both ledgers through on-disk partitions into a result file, deleted when
+        # the next comparison replaces it or the session ends
+        result_file = ScratchFile(RESULTS_DIR)
+        progress_bar = st.progress(0.0, text="Starting reconciliation...")
+        try:
+            status_counts = reconcile_chunked(
+                bank_source, customer_source, result_file.path, atol=atol, rtol=rtol,
+                progress=lambda fraction, message: progress_bar.progress(min(fraction, 1.0), text=message)
+            )
+        except Exception as e:
+            result_file.release()
+            st.error(f"Error reconciling files: {e}")
+        else:
+            status_percentages, total_records = summarize(status_counts)
+            store_results({
+                'inputs': None,
+                'dataset': None,
+                'result_file': result_file,
+                'output_path': result_file.path,
                 'status_counts': status_counts,
                 'status_percentages': status_percentages,
                 'total_records': total_records
-            }
-        
+            })
+            st.session_state.comparison_done = True
+        finally:
+            progress_bar.empty()
+    
+    elif not stream_mode:
+        # Reconcile on request, or again when the files or tolerances change; other reruns
+        # (page flips, sorting, filters) render the results already in session state
+        inputs = (bank_ledger.key, customer_records.key, atol, rtol)
+        results = st.session_state.reconciliation_results
+        if compare_clicked or (st.session_state.comparison_done and (results is None or results['inputs'] != inputs)):
+            st.session_state.comparison_done = True
+            
+            # Display a spinner while processing
+            with st.spinner("Comparing transactions..."):
+                merged_dataset = reconcile_datasets(bank_ledger, customer_records, atol, rtol, workers)
+                status_counts = merged_dataset.derived(
+                    "status_counts", lambda merged: merged['Reconciliation_Status'].value_counts()
+                )
+                
+                # Calculate percentages
+                status_percentages, total_records = summarize(status_counts)
+                
+                # Save results to session state
+                store_results({
+                    'inputs': inputs,
+                    'dataset': merged_dataset,
+                    'result_file': None,
+                    'output_path': None,
+                    'status_counts': status_counts,
+                    'status_percentages': status_percentages,
+                    'total_records': total_records
+                })
+    
+    if st.session_state.comparison_done and st.session_state.reconciliation_results is not None:
         # Display the Reconciliation Summary 
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.subheader("Reconciliation Summary")
         
         results = st.session_state.reconciliation_results
-        merged_data = results['merged_data']
+        merged_dataset = results['dataset']
+        merged_data = merged_dataset.df if merged_dataset is not None else None
         status_percentages = results['status_percentages']
         
         # Summary cards
@@ -280,43 +318,9 @@ if st.session_state.bank_ledger is not None and st.session_state.customer_record
             </div>
             """, unsafe_allow_html=True)
         
-        # Pie chart for reconciliation status
-        status_data = pd.DataFrame({
-            'Status': list(status_percentages.keys()),
-            'Percentage': [status_percentages[status]['percentage'] for status in status_percentages],
-            'Count': [status_percentages[status]['count'] for status in status_percentages]
-        })
-        
-        # Define colors for the chart
-        colors = {
-            'Matched': '#047857',  # Green
-            'Unmatched': '#b91c1c'  # Red
-        }
-        
-        fig = px.pie(
-            status_data, 
-            values='Percentage',
-            names='Status',
-            title='Reconciliation Status Distribution',
-            hole=0.5,
-            color='Status',
-            color_discrete_map=colors
-        )
-        
-        fig.update_traces(
-            textposition='inside',
-            textinfo='percent+label'
-        )
-        
-        fig.update_layout(
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="center",
-                x=0.5
-            )
-        )
+        # Pie chart for reconciliation status, rebuilt only when the counts change
+        chart_key = tuple((status, values['count']) for status, values in status_percentages.items())
+        fig = cached_figure("reconciliation_status", chart_key, lambda: status_chart(status_percentages))
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -327,43 +331,35 @@ if st.session_state.bank_ledger is not None and st.session_state.customer_record
             horizontal=True
         )
         
-        # Prepare display data
-        merged_display = merged.copy()
-        merged_display['Amount_Difference'] = merged_display['Bank_Amount'] - merged_display['Customer_Amount']
-        
-        # Format amounts for display
-        merged_display['Bank_Amount'] = merged_display['Bank_Amount'].apply(
-            lambda x: f"₹{x:,.2f}" if not pd.isna(x) else "Not Found"
-        )
-        merged_display['Customer_Amount'] = merged_display['Customer_Amount'].apply(
-            lambda x: f"₹{x:,.2f}" if not pd.isna(x) else "Not Found"
-        )
-        merged_display['Amount_Difference'] = merged_display['Amount_Difference'].apply(
-            lambda x: f"₹{x:,.2f}" if not pd.isna(x) else "N/A"
-        )
-        
-        # Function to highlight rows based on reconciliation status
-        def highlight_status(val):
-            if val == 'Matched':
-                return 'background-color: #d1fae5'
-            elif val == 'Unmatched':
-                return 'background-color: #fee2e2'
-            else:
-                return ''
-        
-        # Filter and display transactions based on selection
-        if status_filter != "All":
-            filtered_df = merged_display[merged_display['Reconciliation_Status'] == status_filter]
-            st.write(f"### {status_filter} Transactions ({len(filtered_df)} records)")
-            st.dataframe(
-                filtered_df.style.apply(
-                    lambda row: [highlight_status(row['Reconciliation_Status'])] * len(row) 
-                    if 'Reconciliation_Status' in row else [''] * len(row),
-                    axis=1
-                ),
-                use_container_width=True,
-                height=400
+        # Streamed results live on disk; preview the first rows of the chosen status
+        if merged_data is None:
+            if status_filter != "All":
+                preview = read_results(results['output_path'], status=status_filter, limit=1000)
+                st.write(f"### {status_filter} Transactions ({status_percentages[status_filter]['count']} records, first {len(preview)} shown)")
+                st.dataframe(preview, use_container_width=True, height=400)
+            output_path = results['output_path']
+            st.download_button(
+                "Download Full Results", lambda: read_file(output_path),
+                file_name="reconciliation_results.csv", mime="text/csv"
             )
+        else:
+            # Filter and display transactions based on selection
+            if status_filter != "All":
+                matching_rows = np.flatnonzero(merged_data['Reconciliation_Status'] == status_filter)
+                st.write(f"### {status_filter} Transactions ({len(matching_rows)} records)")
+            
+                # Only the visible page is formatted; the results stay numeric
+                paged_table(
+                    merged_data,
+                    key="reconciliation_table",
+                    rows=matching_rows,
+                    sort_columns=['Transaction_ID', 'Bank_Amount', 'Customer_Amount'],
+                    dataset=merged_dataset,
+                    rows_per_page=RESULT_ROWS_PER_PAGE,
+                    style=style_results_page,
+                    use_container_width=True,
+                    height=400
+                )
         
         # Export options
         st.write("### Export Options")
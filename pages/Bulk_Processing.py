@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-import time
 import numpy as np
-from datetime import datetime
+from datetime import date, datetime
+
+from banktech.disbursement import DisbursementError, disburse, payroll_reference
+from banktech.session import use_dataset
+from banktech.table import paged_table
+from banktech.theme import apply_theme
+from banktech.validation import validate_salary
 
 # Page Configuration
 st.set_page_config(
@@ -11,93 +16,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for styling
-def load_css():
-    st.markdown("""
-    <style>
-        /* General styling */
-        .main {
-            background-color: #f9f9f9;
-        }
-        
-        /* Header styling */
-        .header-container {
-            background-color: #1e3a8a;
-            padding: 1.5rem;
-            border-radius: 0.5rem;
-            color: white;
-            margin-bottom: 1rem;
-        }
-        
-        /* Card styling */
-        .card {
-            background-color: white;
-            border-radius: 0.5rem;
-            padding: 1.5rem;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            margin-bottom: 1rem;
-        }
-        
-        /* Button styling */
-        .stButton>button {
-            background-color: #1e3a8a;
-            color: white;
-            border: none;
-            border-radius: 0.25rem;
-            padding: 0.5rem 1rem;
-            font-weight: 500;
-        }
-        
-        .stButton>button:hover {
-            background-color: #2d4eaa;
-        }
-
-        /* Table styling */
-        .stDataFrame {
-            border: 1px solid #e2e8f0;
-            border-radius: 0.5rem;
-            overflow: hidden;
-        }
-        
-        /* Success message */
-        .success-message {
-            background-color: #d1fae5;
-            border-left: 4px solid #10b981;
-            padding: 1rem;
-            border-radius: 0.25rem;
-            margin: 1rem 0;
-        }
-        
-        /* Authentication popup */
-        .auth-popup {
-            background-color: white;
-            border-radius: 0.5rem;
-            padding: 2rem;
-            box-shadow: 0 10px 15px rgba(0, 0, 0, 0.2);
-            max-width: 500px;
-            margin: 0 auto;
-            border: 1px solid #e2e8f0;
-        }
-        
-        /* Information banner */
-        .info-banner {
-            background-color: #e0f2fe;
-            border-left: 4px solid #0ea5e9;
-            padding: 1rem;
-            border-radius: 0.25rem;
-            margin: 1rem 0;
-        }
-        
-        /* Checkbox grid */
-        .checkbox-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(100px, 1fr));
-            gap: 8px;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-load_css()
+# Shared stylesheet, cached by the browser
+apply_theme()
 
 # Header
 st.markdown("""
@@ -108,14 +28,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Session State Initialization
-if 'uploaded_file' not in st.session_state:
-    st.session_state.uploaded_file = None
-if 'df' not in st.session_state:
-    st.session_state.df = None
-if 'selected_all' not in st.session_state:
-    st.session_state.selected_all = False
-if 'individual_selections' not in st.session_state:
-    st.session_state.individual_selections = {}
+if 'selection' not in st.session_state:
+    st.session_state.selection = None
 if 'auth_required' not in st.session_state:
     st.session_state.auth_required = False
 if 'auth_successful' not in st.session_state:
@@ -126,6 +40,8 @@ if 'total_amount' not in st.session_state:
     st.session_state.total_amount = 0
 if 'total_employees' not in st.session_state:
     st.session_state.total_employees = 0
+if 'disbursement' not in st.session_state:
+    st.session_state.disbursement = None
 
 # File Upload Section
 #st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -134,68 +50,137 @@ st.markdown("""
 Upload a CSV file containing employee salary information. The file should include:
 - Employee ID
 - Employee Name
-- Bank Account Number
-- IFSC Code
+- Bank Account Number (9 to 18 digits)
+- IFSC Code (11 characters, e.g. SBIN0001234)
 - Salary Amount
 """)
 
 uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
 if uploaded_file is not None:
-    st.session_state.uploaded_file = uploaded_file
     # Read the file
     try:
-        df = pd.read_csv(uploaded_file)
-        st.session_state.df = df
-        st.session_state.total_amount = df['Salary Amount (INR)'].sum()
+        df = use_dataset("salary", uploaded_file, schema="salary").df
+        # A missing salary column is reported by validation below, not as a read error
+        st.session_state.total_amount = df['Salary Amount (INR)'].sum() if 'Salary Amount (INR)' in df else 0
         st.session_state.total_employees = len(df)
-        # Initialize selections dictionary only if it's empty or size changed
-        if len(st.session_state.individual_selections) != len(df):
-            st.session_state.individual_selections = {i: False for i in range(len(df))}
         st.success(f"File successfully uploaded with {len(df)} employee records.")
     except Exception as e:
         st.error(f"Error reading file: {e}")
 st.markdown('</div>', unsafe_allow_html=True)
 
+# The salary file uploaded earlier in this session, if any
+salary_file = use_dataset("salary")
+
 # Data Preview Section
-if st.session_state.df is not None:
+if salary_file is not None:
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("2. Preview Salary Data")
     
-    df = st.session_state.df
+    df = salary_file.df
     
-    # Select All option - the only selection method available
-    st.checkbox("Select All Records", value=st.session_state.selected_all, key="select_all_master", 
-                on_change=lambda: update_all_selections(True if not st.session_state.selected_all else False))
+    # Check every record once per file; records with errors are never paid
+    validation = salary_file.derived("validation", validate_salary)
+    payable = ~validation.errors
+    if validation.errors.any():
+        st.markdown(f"""
+        <div class="error-message">
+            <b>{int(validation.errors.sum())}</b> of {len(df)} records failed validation and will not be paid.
+            Correct them in the file and upload it again to include them.
+        </div>
+        """, unsafe_allow_html=True)
+    if validation.warnings.any():
+        st.warning(f"{int(validation.warnings.sum())} salaries are far from the rest of the payroll. Check them before processing.")
+    if len(validation.report):
+        with st.expander(f"Validation report ({len(validation.report)} issues)"):
+            st.dataframe(validation.counts().rename("Records").reset_index(), hide_index=True, use_container_width=True)
+            paged_table(validation.report, key="validation_table", rows_per_page=500, use_container_width=True)
+            st.download_button("Download Validation Report", validation.report.to_csv(index=False),
+                               file_name="validation_report.csv", mime="text/csv")
+    elif len(df):
+        st.success("All records passed validation")
     
-    # Function to update all selections when "Select All" is toggled
-    def update_all_selections(value):
-        st.session_state.selected_all = value
-        for i in range(len(df)):
-            st.session_state.individual_selections[i] = value
+    # Without every column there are no banks or amounts to work with
+    if validation.missing_columns:
+        st.markdown(f"""
+        <div class="error-message">
+            The file is missing required columns: <b>{", ".join(validation.missing_columns)}</b>.
+            Add them and upload the file again.
+        </div>
+        """, unsafe_allow_html=True)
+    elif len(df) == 0:
+        st.markdown("""
+        <div class="info-banner">
+            The file has no employee records. Upload a file with at least one record to continue.
+        </div>
+        """, unsafe_allow_html=True)
+
+# Records can be selected and paid once the file has every column and at least one row
+if salary_file is not None and not validation.missing_columns and len(df):
+    # Selected records as one boolean per row, kept until another file is uploaded
+    selection = st.session_state.selection
+    if selection is None or selection['dataset'] != salary_file.key:
+        selection = st.session_state.selection = {
+            'dataset': salary_file.key,
+            'mask': np.zeros(len(df), dtype=bool),
+        }
+    mask = selection['mask']
     
-    # Apply the "Select All" logic if it's active
-    if st.session_state.selected_all:
-        for i in range(len(df)):
-            st.session_state.individual_selections[i] = True
+    # Bank of every record, from the first four characters of its IFSC code
+    banks = salary_file.derived("ifsc_banks", lambda frame: pd.Categorical(frame['IFSC Code'].str[:4].str.upper()))
     
-    # Simplify the data display - no need for selection column since we only have "Select All"
-    # Add a visual indicator that shows if all records are selected
-    if st.session_state.selected_all:
-        st.success("All records are selected for processing")
+    def select_rows(rows, value):
+        """Select or deselect ``rows`` (a boolean mask or a slice); records with errors stay unselected"""
+        mask[rows] = value
+        np.logical_and(mask, payable, out=mask)
+    
+    st.markdown("#### Select Records")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("Select All Valid Records", on_click=select_rows, args=(slice(None), True), use_container_width=True)
+    with col2:
+        st.button("Clear Selection", on_click=select_rows, args=(slice(None), False), use_container_width=True)
     
-    # Display the complete dataframe without selection column
-    st.dataframe(df, use_container_width=True, height=600)
+    # Select by bank
+    bank_col1, bank_col2, bank_col3 = st.columns([3, 1, 1], vertical_alignment="bottom")
+    with bank_col1:
+        chosen_banks = st.multiselect("Banks", options=list(banks.categories), key="selection_banks",
+                                      placeholder="Choose banks by IFSC prefix")
+    in_banks = np.isin(banks.codes, banks.categories.get_indexer(chosen_banks))
+    with bank_col2:
+        st.button("Select Banks", on_click=select_rows, args=(in_banks, True), disabled=not chosen_banks,
+                  use_container_width=True)
+    with bank_col3:
+        st.button("Deselect Banks", on_click=select_rows, args=(in_banks, False), disabled=not chosen_banks,
+                  use_container_width=True)
     
-    # Display metrics about the selection - simplified since we only have "Select All"
+    # Select a range of records, numbered as in the file
+    range_col1, range_col2, range_col3, range_col4 = st.columns([2, 2, 1, 1], vertical_alignment="bottom")
+    with range_col1:
+        first_record = st.number_input("From record", min_value=1, max_value=len(df), value=1, step=1)
+    with range_col2:
+        last_record = st.number_input("To record", min_value=1, max_value=len(df), value=len(df), step=1)
+    record_range = slice(first_record - 1, last_record)
+    with range_col3:
+        st.button("Select Range", on_click=select_rows, args=(record_range, True), use_container_width=True)
+    with range_col4:
+        st.button("Deselect Range", on_click=select_rows, args=(record_range, False), use_container_width=True)
+    
+    # Display the salary data a page at a time
+    show_selected = st.checkbox("Show selected records only")
+    paged_table(df, key="salary_table", rows=np.flatnonzero(mask) if show_selected else None,
+                sort_columns=list(df.columns), dataset=salary_file,
+                rows_per_page=500, use_container_width=True, height=600)
+    
+    # Selection totals are sums over the mask
+    selected_count = int(np.count_nonzero(mask))
+    selected_amount = float(np.sum(df['Salary Amount (INR)'].to_numpy(dtype=float, na_value=np.nan), where=mask))
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Total Records", len(df))
     with col2:
-        selected_count = len(df) if st.session_state.selected_all else 0
         st.metric("Selected Records", selected_count)
     with col3:
-        selected_amount = df['Salary Amount (INR)'].sum() if st.session_state.selected_all else 0
         st.metric("Total Selected Amount", f"₹{selected_amount:,.2f}")
     
     st.markdown('</div>', unsafe_allow_html=True)
@@ -204,15 +189,32 @@ if st.session_state.df is not None:
     #st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("3. Process Payments")
     
-    # Remove the individual record selection section entirely
+    # A payroll is a payroll ID paid for one month, whichever file it comes from, so a
+    # corrected file uploaded again doesn't pay anyone twice
+    payroll_col1, payroll_col2 = st.columns(2)
+    with payroll_col1:
+        payroll_id = st.text_input(
+            "Payroll ID", value="Monthly Salaries", key="payroll_id",
+            help="The employer or payroll these salaries belong to"
+        )
+    with payroll_col2:
+        # Next month first, then this month (the default) and the eleven before it
+        pay_periods = [str(period) for period in pd.period_range(end=pd.Period(date.today(), "M") + 1, periods=13)][::-1]
+        pay_period = st.selectbox(
+            "Pay period", options=pay_periods, index=1, key="pay_period",
+            format_func=lambda period: pd.Period(period).strftime("%B %Y"),
+            help="Employees already paid in this payroll for the chosen month are not paid again"
+        )
     
-    # Process button - simplified since we only have "Select All" option
-    process_disabled = not st.session_state.selected_all
+    process_disabled = not mask.any() or not payroll_id.strip()
     
-    if st.session_state.selected_all:
-        selected_count = len(df)
-        selected_amount = df['Salary Amount (INR)'].sum()
-        
+    if not payable.any():
+        st.markdown("""
+        <div class="info-banner">
+            No records passed validation, so there is nothing to process.
+        </div>
+        """, unsafe_allow_html=True)
+    elif mask.any():
         st.markdown(f"""
         <div class="info-banner">
             You are about to process salary payments for <b>{selected_count}</b> employees, 
@@ -222,7 +224,7 @@ if st.session_state.df is not None:
     else:
         st.markdown("""
         <div class="info-banner">
-            Please select all records to continue with payment processing.
+            Please select the records to pay to continue with payment processing.
         </div>
         """, unsafe_allow_html=True)
     
@@ -237,7 +239,8 @@ if st.session_state.df is not None:
         #st.markdown('<div class="auth-popup">', unsafe_allow_html=True)
         st.subheader("4. Authentication Required")
         st.markdown(f"""
-        <p>You are authorizing a bulk payment of <b>₹{selected_amount:,.2f}</b> to <b>{selected_count}</b> employees.</p>
+        <p>You are authorizing a bulk payment of <b>₹{selected_amount:,.2f}</b> to <b>{selected_count}</b> employees
+        for <b>{pd.Period(pay_period).strftime("%B %Y")}</b>.</p>
         <p>Please provide your authentication credentials to proceed.</p>
         """, unsafe_allow_html=True)
         
@@ -254,12 +257,26 @@ if st.session_state.df is not None:
             # In a real application, this would verify credentials against a secure system
             if st.button("Authenticate"):
                 if auth_username and auth_password:
-                    # Simulate authentication delay
-                    with st.spinner("Verifying credentials..."):
-                        time.sleep(1.5)
-                    st.session_state.auth_successful = True
-                    st.session_state.payment_processed = True
-                    st.rerun()
+                    # Send one payment instruction per employee to the payment rail
+                    progress_bar = st.progress(0.0, text="Sending payment instructions...")
+                    try:
+                        result = disburse(
+                            df[mask], payroll_reference(payroll_id, pay_period),
+                            progress=lambda sent, total: progress_bar.progress(
+                                sent / total, text=f"Sent {sent:,} of {total:,} payment instructions"
+                            )
+                        )
+                    except DisbursementError as e:
+                        progress_bar.empty()
+                        st.error(f"Payment processing failed: {e}")
+                    else:
+                        st.session_state.disbursement = {
+                            'result': result,
+                            'processed_at': datetime.now().strftime("%d-%b-%Y %H:%M:%S"),
+                        }
+                        st.session_state.auth_successful = True
+                        st.session_state.payment_processed = True
+                        st.rerun()
                 else:
                     st.error("Please fill in all authentication fields")
         
@@ -270,18 +287,42 @@ if st.session_state.df is not None:
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.subheader("5. Payment Confirmation")
         
-        # Current date and time
-        current_time = datetime.now().strftime("%d-%b-%Y %H:%M:%S")
-        transaction_id = "TXN" + datetime.now().strftime("%Y%m%d%H%M%S")
+        # The payroll reference is derived from the payroll ID and pay period, so it is the same on every resubmission
+        result = st.session_state.disbursement['result']
+        current_time = st.session_state.disbursement['processed_at']
+        transaction_id = result.payroll_reference
         
-        st.markdown(f"""
-        <div class="success-message">
-            <h3>✅ Bulk Salary Payment Successfully Initiated</h3>
-            <p>Transaction ID: <b>{transaction_id}</b></p>
-            <p>Processed on: <b>{current_time}</b></p>
-            <p>Funds will be credited to the respective accounts within 1-2 hours.</p>
-        </div>
-        """, unsafe_allow_html=True)
+        if result.paid:
+            st.markdown(f"""
+            <div class="success-message">
+                <h3>✅ Bulk Salary Payment Successfully Initiated</h3>
+                <p>Transaction ID: <b>{transaction_id}</b></p>
+                <p>Processed on: <b>{current_time}</b></p>
+                <p>Funds will be credited to the respective accounts within 1-2 hours.</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        if result.already_paid:
+            st.markdown(f"""
+            <div class="info-banner">
+                <b>{result.already_paid}</b> employees (₹{result.already_paid_amount:,.2f}) were already paid
+                under payroll <b>{transaction_id}</b> and were not paid again.
+                To pay them for another month, choose that pay period.
+            </div>
+            """, unsafe_allow_html=True)
+        
+        if result.failed:
+            st.markdown(f"""
+            <div class="error-message">
+                <b>{len(result.failed)}</b> payments were not accepted by the payment rail.
+                Process the payroll again to retry them; employees already paid will not be paid twice.
+            </div>
+            """, unsafe_allow_html=True)
+            st.dataframe(pd.DataFrame({
+                "Employee ID": [instruction.employee_id for instruction, _ in result.failed],
+                "Employee Name": [instruction.employee_name for instruction, _ in result.failed],
+                "Reason": [reason for _, reason in result.failed],
+            }), hide_index=True, use_container_width=True)
         
         col1, col2 = st.columns(2)
         
@@ -290,12 +331,15 @@ if st.session_state.df is not None:
             ### Payment Details
             """)
             details = pd.DataFrame({
-                "Item": ["Number of Employees", "Total Amount", "Processing Fee", "Total Debited"],
+                "Item": ["Number of Employees", "Payment Instructions Accepted", "Already Paid Earlier",
+                         "Total Amount", "Processing Fee", "Total Debited"],
                 "Value": [
                     f"{selected_count}",
+                    f"{result.paid} of {result.total}",
+                    f"{result.already_paid} (₹{result.already_paid_amount:,.2f})",
                     f"₹{selected_amount:,.2f}",
                     f"₹{0:,.2f}",
-                    f"₹{selected_amount:,.2f}"
+                    f"₹{result.paid_amount:,.2f}"
                 ]
             })
             st.table(details)
@@ -316,15 +360,16 @@ if st.session_state.df is not None:
         with col3:
             if st.button("New Transaction"):
                 # Reset the state to start a new transaction
-                for key in ['auth_required', 'auth_successful', 'payment_processed', 'selected_all']:
+                for key in ['auth_required', 'auth_successful', 'payment_processed']:
                     st.session_state[key] = False
-                st.session_state.individual_selections = {i: False for i in range(len(df))}
+                st.session_state.disbursement = None
+                st.session_state.selection = None
                 st.rerun()
         
         st.markdown('</div>', unsafe_allow_html=True)
 
 # Display a message if no file is uploaded
-if st.session_state.uploaded_file is None:
+if salary_file is None:
     st.markdown("""
     <div class="info-banner">
         <p>Please upload a salary CSV file to begin the bulk processing.</p>
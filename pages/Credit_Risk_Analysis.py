@@ -1,237 +1,41 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import io
 
+from banktech.indexes import NameIndex
+from banktech.risk import get_risk_category, get_credit_score_category, score_customers
+from banktech.session import use_dataset
+from banktech.theme import apply_theme
+
 # Set page config
 st.set_page_config(page_title="Credit Risk Analysis", layout="wide")
 
-# Custom CSS to style the app
-st.markdown("""
-<style>
-    /* Main container styling */
-    .main {
-        background-color: #F8F9FA;
-        padding: 20px;
-    }
-    
-    /* Header styling */
-    .header-container {
-        background-color: #1e3a8a;
-        padding: 1.5rem;
-        border-radius: 0.5rem;
-        color: white;
-        margin-bottom: 1rem;
-    }
-    
-    /* Cards styling */
-    .stCardContainer {
-        border-radius: 10px;
-        padding: 20px;
-        background-color: white;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        margin-bottom: 20px;
-    }
-    
-    /* Headers */
-    h1, h2, h3 {
-        color: #ffffff;
-    }
-    
-    /* Metrics */
-    .metric-card {
-        background-color: #f0f2f5;
-        border-radius: 8px;
-        padding: 15px;
-        margin-bottom: 10px;
-    }
-    
-    .metric-label {
-        color: #6c757d;
-        font-size: 14px;
-        margin-bottom: 5px;
-    }
-    
-    .metric-value {
-        font-size: 22px;
-        font-weight: bold;
-    }
-    
-    /* Risk scores */
-    .risk-high {
-        color: #dc3545;
-    }
-    
-    .risk-medium {
-        color: #ffc107;
-    }
-    
-    .risk-low {
-        color: #28a745;
-    }
-    
-    /* Customer profile styling */
-    .customer-name {
-        font-size: 24px;
-        font-weight: bold;
-        margin-bottom: 10px;
-    }
-    
-    .profile-section {
-        margin-bottom: 5px;
-    }
-    
-    .profile-label {
-        color: #6c757d;
-        font-size: 14px;
-    }
-    
-    .profile-value {
-        font-size: 16px;
-        font-weight: bold;
-    }
-    
-    /* Progress bar styling */
-    .progress-container {
-        width: 100%;
-        height: 10px;
-        background-color: #e9ecef;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    
-    .progress-bar-high {
-        height: 100%;
-        border-radius: 5px;
-        background-color: #dc3545;
-    }
-    
-    .progress-bar-medium {
-        height: 100%;
-        border-radius: 5px;
-        background-color: #ffc107;
-    }
-    
-    .progress-bar-low {
-        height: 100%;
-        border-radius: 5px;
-        background-color: #28a745;
-    }
-    
-    /* Alert icon */
-    .risk-alert {
-        color: #dc3545;
-        margin-right: 5px;
-    }
-    
-    /* Search and filters */
-    .search-container {
-        background-color: white;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        margin-bottom: 20px;
-    }
-    
-    /* Risk tag */
-    .risk-tag {
-        display: inline-block;
-        padding: 5px 10px;
-        border-radius: 20px;
-        font-size: 14px;
-        font-weight: bold;
-        color: white;
-    }
-    
-    .high-risk-tag {
-        background-color: #dc3545;
-    }
-    
-    .medium-risk-tag {
-        background-color: #ffc107;
-    }
-    
-    .low-risk-tag {
-        background-color: #28a745;
-    }
-    
-    /* Divider */
-    .divider {
-        border-top: 1px solid #e9ecef;
-        margin: 15px 0;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-def calculate_risk_score(customer):
-    """Calculate a risk score based on customer data"""
-    score = 0
-    
-    # Credit score factor (max 40 points)
-    if customer['Credit_Score'] >= 750:
-        score += 40
-    elif customer['Credit_Score'] >= 700:
-        score += 30
-    elif customer['Credit_Score'] >= 650:
-        score += 20
-    elif customer['Credit_Score'] >= 600:
-        score += 10
-    
-    # Income factor (max 25 points)
-    if customer['Income'] >= 100000:
-        score += 25
-    elif customer['Income'] >= 75000:
-        score += 20
-    elif customer['Income'] >= 50000:
-        score += 15
-    elif customer['Income'] >= 30000:
-        score += 10
-    else:
-        score += 5
-    
-    # Credit utilization (max 15 points)
-    credit_util = customer['Credit_Utilization']
-    if credit_util <= 0.1:
-        score += 15
-    elif credit_util <= 0.3:
-        score += 12
-    elif credit_util <= 0.5:
-        score += 8
-    elif credit_util <= 0.7:
-        score += 4
-    
-    # Default history (max 20 points)
-    if customer['Default_History'] == 'No':
-        score += 20
-    
-    return score
-
-def get_risk_category(score):
-    """Get risk category and styling based on score"""
-    if score >= 80:
-        return "Low Risk", "risk-low", "low-risk-tag"
-    elif score >= 60:
-        return "Medium Risk", "risk-medium", "medium-risk-tag"
-    else:
-        return "High Risk", "risk-high", "high-risk-tag"
-
-def get_credit_score_category(score):
-    """Get credit score category and styling"""
-    if score >= 750:
-        return "Excellent", "risk-low"
-    elif score >= 700:
-        return "Good", "risk-low"
-    elif score >= 650:
-        return "Fair", "risk-medium"
-    elif score >= 600:
-        return "Poor", "risk-medium"
-    else:
-        return "Very Poor", "risk-high"
+# Shared stylesheet, cached by the browser
+apply_theme()
 
 def format_currency(value):
     """Format a number as currency"""
     return f"₹{value:,.0f}"
 
+def unique_customers_of(df):
+    """One row per customer, in order of first appearance"""
+    return df.drop_duplicates(subset=['Customer_ID'])
+
+def build_customer_portfolio(df):
+    """Get unique customers and score them; built once per dataset"""
+    unique_customers = unique_customers_of(df).copy()
+    
+    # Convert Credit_Utilization to float if it's not already
+    if 'Credit_Utilization' in unique_customers.columns:
+        unique_customers['Credit_Utilization'] = unique_customers['Credit_Utilization'].astype(float)
+    
+    # Score the whole portfolio in one pass
+    return unique_customers, score_customers(unique_customers)
+
+def build_name_index(df):
+    """Index customer names by position in the portfolio; built once per dataset"""
+    return NameIndex(unique_customers_of(df)['Name'])
+
 def main():
     # Heading
     st.markdown("""
@@ -250,17 +54,18 @@ def main():
     # File uploader
     uploaded_file = st.file_uploader("Upload CSV file", type=['csv'])
     
-    if uploaded_file is not None:
+    # The transaction file is shared with the other pages of this session
+    try:
+        dataset = use_dataset("transactions", uploaded_file, schema="transactions")
+    except Exception as e:
+        st.error(f"Error processing file: {e}")
+        dataset = None
+    
+    if dataset is not None:
         # Load and process data
         try:
-            df = pd.read_csv(uploaded_file)
-            
-            # Convert Credit_Utilization to float if it's not already
-            if 'Credit_Utilization' in df.columns:
-                df['Credit_Utilization'] = df['Credit_Utilization'].astype(float)
-            
-            # Get unique customers
-            unique_customers = df.drop_duplicates(subset=['Customer_ID']).copy()
+            unique_customers, risk_scores = dataset.derived("credit_risk_portfolio", build_customer_portfolio)
+            customer_names = dataset.derived("credit_risk_name_index", build_name_index)
             
             # Calculate risk metrics for dashboard
             avg_credit_score = int(unique_customers['Credit_Score'].mean())
@@ -276,41 +81,41 @@ def main():
             
             with col1:
                 st.markdown("""
-                <div class="metric-card" style="background-color: #e6f0ff;">
-                    <div class="metric-label">Average Credit Score</div>
-                    <div class="metric-value">{}</div>
+                <div class="risk-metric-card" style="background-color: #e6f0ff;">
+                    <div class="risk-metric-label">Average Credit Score</div>
+                    <div class="risk-metric-value">{}</div>
                 </div>
                 """.format(avg_credit_score), unsafe_allow_html=True)
                 
             with col2:
                 st.markdown("""
-                <div class="metric-card" style="background-color: #ffe6e6;">
-                    <div class="metric-label">Default Rate</div>
-                    <div class="metric-value">{}%</div>
+                <div class="risk-metric-card" style="background-color: #ffe6e6;">
+                    <div class="risk-metric-label">Default Rate</div>
+                    <div class="risk-metric-value">{}%</div>
                 </div>
                 """.format(default_rate), unsafe_allow_html=True)
                 
             with col3:
                 st.markdown("""
-                <div class="metric-card" style="background-color: #fff5e6;">
-                    <div class="metric-label">High Risk Customers</div>
-                    <div class="metric-value">{}%</div>
+                <div class="risk-metric-card" style="background-color: #fff5e6;">
+                    <div class="risk-metric-label">High Risk Customers</div>
+                    <div class="risk-metric-value">{}%</div>
                 </div>
                 """.format(high_risk_perc), unsafe_allow_html=True)
                 
             with col4:
                 st.markdown("""
-                <div class="metric-card" style="background-color: #e6ffe6;">
-                    <div class="metric-label">Avg Credit Utilization</div>
-                    <div class="metric-value">{}%</div>
+                <div class="risk-metric-card" style="background-color: #e6ffe6;">
+                    <div class="risk-metric-label">Avg Credit Utilization</div>
+                    <div class="risk-metric-value">{}%</div>
                 </div>
                 """.format(avg_credit_util), unsafe_allow_html=True)
                 
             with col5:
                 st.markdown("""
-                <div class="metric-card" style="background-color: #f0e6ff;">
-                    <div class="metric-label">Approval Ratio</div>
-                    <div class="metric-value">65%</div>
+                <div class="risk-metric-card" style="background-color: #f0e6ff;">
+                    <div class="risk-metric-label">Approval Ratio</div>
+                    <div class="risk-metric-value">65%</div>
                 </div>
                 """.format(), unsafe_allow_html=True)
             
@@ -330,7 +135,28 @@ def main():
                 if search_by == "Customer ID":
                     filtered_customers = unique_customers[unique_customers['Customer_ID'].astype(str).str.contains(search_term)]
                 elif search_by == "Name":
-                    filtered_customers = unique_customers[unique_customers['Name'].str.contains(search_term, case=False)]
+                    # Best matching names first, so the profile below shows the closest match
+                    filtered_customers = unique_customers.iloc[customer_names.search(search_term, ranked=True)]
+            
+            # Portfolio risk table for every customer matching the search
+            st.markdown("### Portfolio Risk Table")
+            portfolio = unique_customers.loc[
+                filtered_customers.index,
+                ['Customer_ID', 'Name', 'Credit_Score', 'Income', 'Credit_Utilization', 'Default_History']
+            ].join(risk_scores).sort_values('Risk_Score', kind='stable')
+            st.dataframe(
+                portfolio,
+                column_config={
+                    "Income": st.column_config.NumberColumn("Income", format="₹%d"),
+                    "Credit_Utilization": st.column_config.NumberColumn("Credit Utilization", format="%.2f"),
+                    "Risk_Score": st.column_config.ProgressColumn("Risk Score", min_value=0, max_value=100, format="%d"),
+                    "Default_Probability": st.column_config.NumberColumn("Default Probability", format="%d%%"),
+                    "Max_Loan": st.column_config.NumberColumn("Recommended Max Loan", format="₹%d"),
+                },
+                hide_index=True,
+                use_container_width=True,
+                height=400
+            )
             
             # Display search results
             if not filtered_customers.empty:
@@ -339,7 +165,7 @@ def main():
                 
                 st.markdown(f"""
                 <div class="stCardContainer">
-                    <div class="customer-name">{selected_customer['Name']}</div>
+                    <div class="profile-name">{selected_customer['Name']}</div>
                     <div>Customer ID: {selected_customer['Customer_ID']} | Age: {selected_customer['Age']}</div>
                 </div>
                 """, unsafe_allow_html=True)
@@ -347,14 +173,15 @@ def main():
                 # Customer profile and risk assessment columns
                 col1, col2 = st.columns(2)
                 
-                # Calculate risk score for the customer
-                risk_score = calculate_risk_score(selected_customer)
+                # Look up the customer's precomputed risk metrics
+                selected_scores = risk_scores.loc[selected_customer.name]
+                risk_score = int(selected_scores['Risk_Score'])
                 risk_category, risk_color_class, risk_tag_class = get_risk_category(risk_score)
                 credit_category, credit_color_class = get_credit_score_category(selected_customer['Credit_Score'])
-                default_probability = 100 - risk_score
+                default_probability = int(selected_scores['Default_Probability'])
                 
                 # Maximum loan amount calculation (simple formula for demonstration)
-                max_loan = round((risk_score / 100) * selected_customer['Income'] * 3)
+                max_loan = selected_scores['Max_Loan']
                 
                 # Customer Profile Card
                 with col1:
@@ -407,12 +234,10 @@ def main():
                     st.progress(risk_score/100)
                     
                     st.markdown("**Default Probability**")
-                    default_probability = 100 - risk_score
                     default_color = "#dc3545" if default_probability > 30 else "#28a745"
                     st.markdown(f"<span style='color: {default_color};'>{default_probability}%</span>", unsafe_allow_html=True)
                     
                     st.markdown("**Recommended Max Loan**")
-                    max_loan = round((risk_score / 100) * selected_customer['Income'] * 3)
                     st.markdown(f"{format_currency(max_loan)}")
                     
                     st.markdown("---")
@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import datetime
 
+from banktech.figures import cached_figure
+from banktech.lazy import lazy_import
+from banktech.theme import apply_theme
+
+# Plotly is only imported when a chart isn't in the figure cache
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
 # Set page configuration
 st.set_page_config(
     page_title="BankTech AI Suite - Dashboard",
@@ -11,171 +17,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Add custom CSS
-st.markdown("""
-<style>
-    .dashboard-header {
-        font-size: 2.2rem;
-        font-weight: 700;
-        color: #0A2559;
-        margin-bottom: 1rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #E2E8F0;
-    }
-    
-    /* Header styling */
-    .header-container {
-        background-color: #1e3a8a;
-        padding: 1.5rem;
-        border-radius: 0.5rem;
-        color: white;
-        margin-bottom: 1rem;
-    }
-    
-    .welcome-banner {
-        background: linear-gradient(to right, #0A2559, #183C7E);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 8px;
-        margin-bottom: 1.5rem;
-    }
-    
-    .welcome-title {
-        font-size: 1.4rem;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-    }
-    
-    .welcome-subtitle {
-        font-size: 1rem;
-        opacity: 0.9;
-    }
-    
-    .metric-card {
-        background-color: white;
-        border-radius: 8px;
-        padding: 1.25rem;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        height: 100%;
-    }
-    
-    .metric-label {
-        font-size: 0.9rem;
-        color: #718096;
-        margin-bottom: 0.5rem;
-    }
-    
-    .metric-value {
-        font-size: 2rem;
-        font-weight: 700;
-        color: #0A2559;
-    }
-    
-    .metric-delta {
-        font-size: 0.9rem;
-        margin-top: 0.25rem;
-    }
-    
-    .positive-delta {
-        color: #48BB78;
-    }
-    
-    .negative-delta {
-        color: #F56565;
-    }
-    
-    .neutral-delta {
-        color: #718096;
-    }
-    
-    .section-title {
-        font-size: 1.3rem;
-        font-weight: 600;
-        color: #2D3748;
-        margin: 1.5rem 0 1rem 0;
-    }
-    
-    .module-card {
-        background-color: white;
-        border-radius: 8px;
-        padding: 1.5rem;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        height: 100%;
-        margin-bottom: 1rem;
-    }
-    
-    .module-title {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #0A2559;
-        margin-bottom: 1rem;
-    }
-    
-    .chart-container {
-        background-color: white;
-        border-radius: 8px;
-        padding: 1.5rem;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        margin-bottom: 1.5rem;
-    }
-    
-    .chart-title {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #2D3748;
-        margin-bottom: 1rem;
-    }
-    
-    .footer {
-        text-align: center;
-        color: #718096;
-        padding-top: 2rem;
-        font-size: 0.9rem;
-    }
-    
-    .sidebar-title {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #0A2559;
-        margin: 1rem 0;
-    }
-    
-    .sidebar .stButton button {
-        background-color: transparent;
-        color: #2D3748;
-        text-align: left;
-        font-weight: 400;
-        padding: 0.5rem 0.75rem;
-        border: none;
-        border-radius: 4px;
-        margin-bottom: 0.25rem;
-        width: 100%;
-    }
-    
-    .sidebar .stButton button:hover {
-        background-color: #EDF2F7;
-    }
-    
-    .main-content {
-        padding: 0 1rem;
-    }
-    
-    hr {
-        margin: 1rem 0;
-        border-top: 1px solid #E2E8F0;
-    }
-    
-    [data-testid="stSidebar"] {
-        background-color: #F8FAFC;
-    }
-    
-    [data-testid="stSidebar"] [data-testid="stImage"] {
-        text-align: center;
-        display: block;
-        margin: 1rem auto;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet, cached by the browser
+apply_theme()
 
 # Sample data generation functions
 def generate_transaction_data():
@@ -226,6 +69,82 @@ def generate_credit_data():
     
     return df
 
+def transaction_volume_chart():
+    """Line chart of the daily transaction volume"""
+    transaction_data = generate_transaction_data()
+    
+    fig = px.line(
+        transaction_data, 
+        x='date', 
+        y='transaction_count',
+        labels={'date': 'Date', 'transaction_count': 'Number of Transactions'},
+        line_shape='spline',
+        template='plotly_white'
+    )
+    
+    fig.update_traces(line=dict(color='#0A2559', width=3))
+    fig.update_layout(
+        height=350,
+        margin=dict(l=20, r=20, t=20, b=20),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, gridcolor='#E2E8F0')
+    )
+    
+    return fig
+
+def fraud_chart():
+    """Grouped bars of detected fraud and false positives per category"""
+    fraud_data = generate_fraud_data()
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=fraud_data['category'],
+        y=fraud_data['detected'],
+        name='Detected Fraud',
+        marker_color='#0A2559'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=fraud_data['category'],
+        y=fraud_data['false_positives'],
+        name='False Positives',
+        marker_color='#F56565'
+    ))
+    
+    fig.update_layout(
+        barmode='group',
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=250,
+        legend=dict(orientation='h', yanchor='bottom', y=-0.3, xanchor='center', x=0.5),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, gridcolor='#E2E8F0')
+    )
+    
+    return fig
+
+def credit_score_chart():
+    """Bar chart of the customer credit score distribution"""
+    credit_data = generate_credit_data()
+    
+    fig = px.bar(
+        credit_data,
+        x='score_range',
+        y='percentage',
+        labels={'score_range': 'Credit Score Range', 'percentage': 'Percentage of Customers'},
+        color='percentage',
+        color_continuous_scale=px.colors.sequential.Blues
+    )
+    
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=20, b=20),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, gridcolor='#E2E8F0'),
+        coloraxis_showscale=False
+    )
+    
+    return fig
+
 def main():
     # Main content
     st.markdown('<div class="dashboard-header">Banking Operations Dashboard</div>', unsafe_allow_html=True)
@@ -287,28 +206,11 @@ def main():
     # Transaction activity chart
     st.markdown('<div class="section-title">Transaction Activity</div>', unsafe_allow_html=True)
     
-    transaction_data = generate_transaction_data()
-    
     with st.container():
         #st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="chart-title">Daily Transaction Volume</div>', unsafe_allow_html=True)
         
-        fig = px.line(
-            transaction_data, 
-            x='date', 
-            y='transaction_count',
-            labels={'date': 'Date', 'transaction_count': 'Number of Transactions'},
-            line_shape='spline',
-            template='plotly_white'
-        )
-        
-        fig.update_traces(line=dict(color='#0A2559', width=3))
-        fig.update_layout(
-            height=350,
-            margin=dict(l=20, r=20, t=20, b=20),
-            xaxis=dict(showgrid=False),
-            yaxis=dict(showgrid=True, gridcolor='#E2E8F0')
-        )
+        fig = cached_figure("dashboard_transaction_volume", None, transaction_volume_chart)
         
         st.plotly_chart(fig, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -318,31 +220,7 @@ def main():
     #st.markdown('<div class="module-card">', unsafe_allow_html=True)
     st.markdown('<div class="module-title">🛡️ Fraud Detection Overview</div>', unsafe_allow_html=True)
     
-    fraud_data = generate_fraud_data()
-    
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=fraud_data['category'],
-        y=fraud_data['detected'],
-        name='Detected Fraud',
-        marker_color='#0A2559'
-    ))
-    
-    fig.add_trace(go.Bar(
-        x=fraud_data['category'],
-        y=fraud_data['false_positives'],
-        name='False Positives',
-        marker_color='#F56565'
-    ))
-    
-    fig.update_layout(
-        barmode='group',
-        margin=dict(l=20, r=20, t=20, b=20),
-        height=250,
-        legend=dict(orientation='h', yanchor='bottom', y=-0.3, xanchor='center', x=0.5),
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True, gridcolor='#E2E8F0')
-    )
+    fig = cached_figure("dashboard_fraud", None, fraud_chart)
     
     st.plotly_chart(fig, use_container_width=True)
     
@@ -364,24 +242,7 @@ def main():
         #st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="chart-title">Customer Credit Score Distribution</div>', unsafe_allow_html=True)
         
-        credit_data = generate_credit_data()
-        
-        fig = px.bar(
-            credit_data,
-            x='score_range',
-            y='percentage',
-            labels={'score_range': 'Credit Score Range', 'percentage': 'Percentage of Customers'},
-            color='percentage',
-            color_continuous_scale=px.colors.sequential.Blues
-        )
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=20, b=20),
-            xaxis=dict(showgrid=False),
-            yaxis=dict(showgrid=True, gridcolor='#E2E8F0'),
-            coloraxis_showscale=False
-        )
+        fig = cached_figure("dashboard_credit_scores", None, credit_score_chart)
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -0,0 +1,55 @@
+"""
+Generate AI reports for every customer in a transaction file.
+
+Results go to a SQLite store; rerunning the same command resumes after
+the last finished customer and retries failed ones.
+
+Usage (from the repository root):
+    python -m scripts.batch_reports transactions.csv --store reports/portfolio.sqlite \
+        --workers 4 --rate 60 --export reports/markdown
+"""
+import argparse
+import sys
+
+from banktech.batch import DEFAULT_RATE_PER_MINUTE, DEFAULT_WORKERS, ReportStore, run_portfolio_reports
+from banktech.ingest import load_csv
+from banktech.reports import ReportError
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("transactions", help="transaction CSV file")
+    parser.add_argument("--store", default="portfolio_reports.sqlite", help="SQLite file for the results")
+    parser.add_argument("--customers", type=int, nargs="+", help="only these Customer_IDs")
+    parser.add_argument("--limit", type=int, help="stop after this many customers")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="reports generated at once")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_MINUTE, help="model calls per minute")
+    parser.add_argument("--charts", action="store_true", help="also store the charts as Plotly JSON")
+    parser.add_argument("--export", metavar="DIR", help="write finished reports to DIR as Markdown")
+    args = parser.parse_args()
+
+    df = load_csv(args.transactions, "transactions")
+    customer_ids = args.customers or df["Customer_ID"].drop_duplicates().tolist()
+    if args.limit is not None:
+        customer_ids = customer_ids[:args.limit]
+
+    def progress(done, total):
+        print(f"\r{done}/{total} customers", end="", file=sys.stderr, flush=True)
+
+    store = ReportStore(args.store)
+    try:
+        counts = run_portfolio_reports(df, store, customer_ids, workers=args.workers,
+                                       rate_per_minute=args.rate, charts=args.charts, progress=progress)
+    except ReportError as e:
+        sys.exit(f"Report generation failed: {e}")
+    except KeyboardInterrupt:
+        sys.exit(f"\nInterrupted; rerun to resume. Stored so far: {store.counts()}")
+    finally:
+        print(file=sys.stderr)
+
+    print(f"Stored reports: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed")
+    if args.export:
+        print(f"Exported {store.export(args.export)} reports to {args.export}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
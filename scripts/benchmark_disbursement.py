@@ -0,0 +1,57 @@
+"""
+Measure bulk salary disbursement throughput against the local file rail.
+
+The same payroll is then submitted again to check that nobody is paid twice.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_disbursement --employees 100000 --failure-rate 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from banktech.disbursement import (DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, FileRailAdapter, disburse,
+                                   payroll_reference)
+
+def make_payroll(employees, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, employees + 1)
+    return pd.DataFrame({
+        "Employee ID": [f"E{i:07d}" for i in ids],
+        "Employee Name": [f"Employee {i}" for i in ids],
+        "Bank Account Number": rng.integers(10**11, 10**12, employees).astype(str),
+        "IFSC Code": "SBIN0" + pd.Series(rng.integers(10**5, 10**6, employees).astype(str)),
+        "Salary Amount (INR)": rng.uniform(20_000, 200_000, employees).round(2),
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of batch submissions that time out")
+    args = parser.parse_args()
+
+    df = make_payroll(args.employees)
+    payroll = payroll_reference(f"benchmark-{args.employees}", "2026-01")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for run in ("first run", "resubmitted"):
+            rail = FileRailAdapter(directory, failure_rate=args.failure_rate, seed=1)
+            start = time.perf_counter()
+            result = disburse(df, payroll, rail, batch_size=args.batch_size, workers=args.workers, backoff=0.01)
+            elapsed = time.perf_counter() - start
+
+            with open(os.path.join(directory, f"{payroll}.jsonl"), encoding="utf-8") as f:
+                written = sum(1 for _ in f)
+            print(f"{run}: {result.paid:,} paid, {result.already_paid:,} already paid, "
+                  f"{len(result.failed):,} failed, {result.retries} retries, "
+                  f"{written:,} instructions on the rail, {elapsed:.2f} s "
+                  f"({result.total / elapsed * 60:,.0f} instructions/min)")
+
+if __name__ == "__main__":
+    main()
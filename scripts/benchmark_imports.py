@@ -0,0 +1,71 @@
+"""
+Measure the module import time of Home.py and every page, as on a cold worker.
+
+Each script's top-level imports run in a fresh interpreter under
+``python -X importtime``; the rest of the script is not executed.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_imports --top 5 --max-ms 1500
+"""
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def page_scripts():
+    return [os.path.join(ROOT, "Home.py")] + sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+def top_level_imports(path):
+    """Return the source of a script's module-level import statements"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def import_times(code):
+    """Run ``code`` under -X importtime; return {module: (self_us, cumulative_us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=5, help="heaviest modules to list per script")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per script; the fastest is kept")
+    parser.add_argument("--max-ms", type=float, help="exit with an error if any script imports slower than this")
+    args = parser.parse_args()
+
+    slow = []
+    for path in page_scripts():
+        code = top_level_imports(path)
+        runs = [import_times(code) for _ in range(args.repeat)]
+        times = min(runs, key=lambda run: sum(self_us for self_us, _ in run.values()))
+        total_ms = sum(self_us for self_us, _ in times.values()) / 1e3
+
+        print(f"{os.path.relpath(path, ROOT)}: {total_ms:.0f} ms, {len(times)} modules")
+        heaviest = sorted(
+            ((cumulative_us, module) for module, (_, cumulative_us) in times.items() if "." not in module),
+            reverse=True
+        )
+        for cumulative_us, module in heaviest[:args.top]:
+            print(f"    {module:<28}{cumulative_us / 1e3:8.0f} ms")
+
+        if args.max_ms is not None and total_ms > args.max_ms:
+            slow.append(os.path.relpath(path, ROOT))
+
+    if slow:
+        sys.exit(f"Import time over {args.max_ms:.0f} ms: {', '.join(slow)}")
+
+if __name__ == "__main__":
+    main()
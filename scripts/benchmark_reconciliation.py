@@ -0,0 +1,63 @@
+"""
+Benchmark reconciliation throughput against the number of worker processes.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_reconciliation --rows 5000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from banktech.reconciliation import reconcile, reconcile_parallel
+
+def make_ledgers(rows, seed=42):
+    """Build a bank ledger and customer records with ~90% matching transactions"""
+    rng = np.random.default_rng(seed)
+    transaction_ids = rng.permutation(rows * 2)[:rows]
+    amounts = rng.uniform(10, 100000, rows).round(2)
+
+    bank = pd.DataFrame({'Transaction_ID': transaction_ids, 'Transactions_Amount': amounts})
+
+    customer_amounts = amounts.copy()
+    mismatched = rng.random(rows) < 0.05
+    customer_amounts[mismatched] += 1
+    missing = rng.random(rows) < 0.05
+    customer = pd.DataFrame({'Transaction_ID': transaction_ids[~missing],
+                             'Transaction_Amount': customer_amounts[~missing]})
+    return bank, customer.sample(frac=1, random_state=seed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    bank, customer = make_ledgers(args.rows)
+    print(f"{args.rows:,} bank rows, {len(customer):,} customer rows, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    expected = reconcile(bank, customer)
+    baseline = time.perf_counter() - start
+    print(f"{'in-memory':>10}: {baseline:7.2f} s  {args.rows / baseline:12,.0f} rows/s")
+
+    for workers in args.workers:
+        # First call starts the worker processes; don't count it
+        merged, _ = reconcile_parallel(bank, customer, workers)
+        pd.testing.assert_frame_equal(merged, expected)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            reconcile_parallel(bank, customer, workers)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{workers:>3} workers: {best:7.2f} s  {args.rows / best:12,.0f} rows/s  "
+              f"x{baseline / best:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark the AI report text normalization against the original pipeline.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_text --reports 2000
+"""
+import argparse
+import random
+import re
+import timeit
+
+from banktech.text import normalize_report
+
+def legacy_normalize(report):
+    """The original post-processing: nine re.sub calls compiled on the fly"""
+    report = re.sub(r'(\d+)([a-zA-Z])', r'\1 \2', report)
+    patterns = [
+        (r'over\s*the\s*analyzed\s*period', 'over the analyzed period'),
+        (r'The\s*average', 'The average'),
+        (r'compared\s*to', 'compared to'),
+        (r'resulting\s*in', 'resulting in'),
+        (r'indicates\s*a', 'indicates a'),
+        (r'with\s*an', 'with an'),
+        (r'of\s*₹', 'of ₹'),
+        (r'balance\s*of', 'balance of')
+    ]
+    for pattern, replacement in patterns:
+        report = re.sub(pattern, replacement, report, flags=re.IGNORECASE)
+    return report
+
+SENTENCES = [
+    "The customer made {n} transactions over the analyzed period, with an average of ₹{amount}.",
+    "The average transaction amount is ₹{amount}, compared to {n} credit transactions of ₹{amount}.",
+    "Debits exceed credits, resulting in a net balance of ₹{amount}.",
+    "This indicates a steady income with {n} large withdrawals.",
+]
+
+def make_report(rng, sentences=40):
+    """A report-like text where the model ran some words together"""
+    text = " ".join(
+        rng.choice(SENTENCES).format(n=rng.randint(1, 99), amount=f"{rng.randint(100, 99999):,}")
+        for _ in range(sentences)
+    )
+    # Drop about a third of the spaces, the way the model sometimes does
+    return "".join(char for char in text if char != " " or rng.random() > 0.3)
+
+WORDS = ["over", "the", "analyzed", "period", "The", "average", "compared", "to", "resulting",
+         "in", "indicates", "a", "with", "an", "of", "₹", "balance", "transactions", "credit",
+         "Debit", "5", "12,500", "₹4,200", "3credit", "\n", "## Summary:", "customer"]
+
+def make_word_soup(rng, words=600):
+    """Random phrase fragments run together, including overlapping phrases"""
+    return "".join(rng.choice(WORDS) + rng.choice(["", " ", " ", "  "]) for _ in range(words))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    corpora = {
+        "reports": [make_report(rng) for _ in range(args.reports)],
+        "word soup": [make_word_soup(rng) for _ in range(args.reports)],
+    }
+
+    for corpus, texts in corpora.items():
+        mismatches = sum(legacy_normalize(text) != normalize_report(text) for text in texts)
+        print(f"{corpus}: {len(texts)} texts, {mismatches} differ from the original pipeline")
+
+        for name, function in [("original", legacy_normalize), ("precompiled", normalize_report)]:
+            best = min(timeit.repeat(lambda: [function(text) for text in texts],
+                                     number=1, repeat=args.repeat))
+            print(f"{name:>14}: {best * 1e3:8.1f} ms  {best / len(texts) * 1e6:8.1f} us/text")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measure salary file validation on a large synthetic payroll.
+
+A share of the rows is corrupted so every rule has something to report.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_validation --employees 1000000 --invalid-rate 0.01
+"""
+import argparse
+import time
+
+import numpy as np
+
+from banktech.ingest import SCHEMAS, apply_schema
+from banktech.validation import validate_salary
+from scripts.benchmark_disbursement import make_payroll
+
+def corrupt(df, rate, seed=0):
+    """Break ``rate`` of the rows, spread evenly over the kinds of mistake"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(df), int(len(df) * rate), replace=False)
+    bad_ifsc, bad_account, duplicate, no_name, negative, outlier = np.array_split(rows, 6)
+    df.loc[bad_ifsc, "IFSC Code"] = df.loc[bad_ifsc, "IFSC Code"].str.replace("0", "", n=1)
+    df.loc[bad_account, "Bank Account Number"] = df.loc[bad_account, "Bank Account Number"].str[:6]
+    df.loc[duplicate, "Employee ID"] = df.loc[0, "Employee ID"]
+    df.loc[no_name, "Employee Name"] = ""
+    df.loc[negative, "Salary Amount (INR)"] *= -1
+    df.loc[outlier, "Salary Amount (INR)"] *= 100
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--employees", type=int, default=1_000_000)
+    parser.add_argument("--invalid-rate", type=float, default=0.01, help="share of rows to corrupt")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = corrupt(apply_schema(make_payroll(args.employees), SCHEMAS["salary"]), args.invalid_rate)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = validate_salary(df)
+        timings.append(time.perf_counter() - start)
+
+    print(f"{len(df):,} rows validated in {min(timings):.3f} s (best of {args.repeat})")
+    print(f"{int(result.errors.sum()):,} rows with errors, {int(result.warnings.sum()):,} with warnings")
+    print(result.counts().to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Show how much memory a CSV extract takes with default inference and with its schema.
+
+Usage (from the repository root):
+    python -m scripts.memory_report transactions.csv --schema transactions
+"""
+import argparse
+
+import pandas as pd
+
+from banktech.ingest import SCHEMAS, read_csv_typed
+
+def column_memory(df):
+    return df.memory_usage(deep=True, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV file")
+    parser.add_argument("--schema", default="transactions", choices=sorted(SCHEMAS))
+    args = parser.parse_args()
+
+    before = pd.read_csv(args.path)
+    after = read_csv_typed(args.path, args.schema)
+    before_bytes, after_bytes = column_memory(before), column_memory(after)
+
+    print(f"{len(before):,} rows")
+    print(f"{'column':<24}{'inferred':>16}{'MB':>9}{'schema':>18}{'MB':>9}")
+    for column in before.columns:
+        print(f"{column:<24}{str(before[column].dtype):>16}{before_bytes[column] / 1e6:>9.2f}"
+              f"{str(after[column].dtype):>18}{after_bytes[column] / 1e6:>9.2f}")
+    print(f"{'total':<24}{before_bytes.sum() / 1e6:>25.2f}{after_bytes.sum() / 1e6:>27.2f}")
+    print(f"{before_bytes.sum() / after_bytes.sum():.1f}x smaller")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import json
+
+import pandas as pd
+
+from banktech.disbursement import FileRailAdapter, disburse, get_rail, payroll_reference
+
+def make_salaries(rows):
+    return pd.DataFrame(rows, columns=["Employee ID", "Employee Name", "Bank Account Number", "IFSC Code",
+                                       "Salary Amount (INR)"])
+
+FIRST_UPLOAD = make_salaries([
+    ("E001", "Vivaan Menon", "693263798805", "SBIN0052381", 67790.88),
+])
+# The same payroll after correcting a rejected row and uploading the file again
+CORRECTED_UPLOAD = make_salaries([
+    ("E001", "Vivaan Menon", "693263798805", "SBIN0052381", 67790.88),
+    ("E002", "Siddharth Kumar", "977249879964", "UTIB0021641", 69285.87),
+])
+
+def rail_records(directory, payroll):
+    with open(directory / f"{payroll}.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_corrected_upload_pays_nobody_twice(tmp_path):
+    rail = FileRailAdapter(tmp_path)
+    payroll = payroll_reference("Acme Payroll", "2026-10")
+
+    first = disburse(FIRST_UPLOAD, payroll, rail)
+    assert (first.paid, first.already_paid) == (1, 0)
+
+    second = disburse(CORRECTED_UPLOAD, payroll_reference(" acme  payroll ", "2026-10"), FileRailAdapter(tmp_path))
+    assert (second.paid, second.already_paid, second.failed) == (1, 1, [])
+    assert second.paid_paise == 6928587
+    assert [record["employee_id"] for record in rail_records(tmp_path, payroll)] == ["E001", "E002"]
+
+def test_next_pay_period_is_a_new_payroll(tmp_path):
+    rail = FileRailAdapter(tmp_path)
+    disburse(CORRECTED_UPLOAD, payroll_reference("Acme Payroll", "2026-10"), rail)
+
+    result = disburse(CORRECTED_UPLOAD, payroll_reference("Acme Payroll", "2026-11"), rail)
+    assert (result.paid, result.already_paid) == (2, 0)
+
+def test_retries_transient_failures(tmp_path):
+    rail = FileRailAdapter(tmp_path, failure_rate=0.5, seed=3)
+    result = disburse(CORRECTED_UPLOAD, payroll_reference("Acme Payroll", "2026-10"), rail,
+                      batch_size=1, max_attempts=20, backoff=0)
+    assert (result.paid, result.failed) == (2, [])
+    assert result.retries > 0
+
+def test_sessions_share_one_rail():
+    assert get_rail() is get_rail()
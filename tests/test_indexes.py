@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from banktech.indexes import KeyIndex, NameIndex
+
+FIRST_NAMES = ["Aarav", "Diya", "Vivaan", "Ananya", "Rohan", "Meera", "Ishaan", "Saanvi", "O'Brien", "Anne-Marie"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Menon", "Patel", "Kumar", "Nair", "D'Souza", "Rao (Jr.)", "Shah+"]
+
+def make_names(rows=5_000, seed=11):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(rows):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        names.append(rng.choice([name, name.upper(), name.lower(), None]))
+    return pd.Series(names, dtype=object)
+
+def make_terms(names, count=300, seed=5):
+    """Substrings of the names in random case, plus terms that match nothing"""
+    rng = random.Random(seed)
+    present = [name for name in names if name is not None]
+    terms = ["", "a", "(", "+", ".", "rao (", "xyz", "sharmaa", "shah+"]
+    for _ in range(count):
+        name = rng.choice(present)
+        start = rng.randrange(len(name))
+        term = name[start:start + rng.randint(1, 8)]
+        terms.append("".join(char.upper() if rng.random() < 0.5 else char.lower() for char in term))
+    return terms
+
+def reference_search(names, term):
+    return np.flatnonzero([name is not None and term.lower() in name.lower() for name in names])
+
+def test_search_matches_lowercase_substring_test():
+    names = make_names()
+    index = NameIndex(names)
+    for term in make_terms(names):
+        np.testing.assert_array_equal(index.search(term), reference_search(names, term), err_msg=repr(term))
+
+def test_search_matches_str_contains_ignoring_case():
+    names = make_names()
+    index = NameIndex(names)
+    for term in make_terms(names):
+        expected = np.flatnonzero(names.str.contains(term, case=False, regex=False, na=False).to_numpy())
+        np.testing.assert_array_equal(index.search(term), expected, err_msg=repr(term))
+
+def test_ranked_search_orders_best_match_first():
+    names = pd.Series(["Rao Kumar", "Meera Rao", "Nirao Das", "rao", "RAO KUMAR"], dtype=object)
+    index = NameIndex(names)
+
+    assert index.search("rao").tolist() == [0, 1, 2, 3, 4]
+    # Exact, then prefix, then word prefix, then substring; row order within each
+    assert index.search("rao", ranked=True).tolist() == [3, 0, 4, 1, 2]
+
+@pytest.mark.parametrize("term, expected", [
+    ("ß", [0]),
+    ("SS", [1]),
+    ("strasse", [1]),
+])
+def test_case_folds_like_str_lower(term, expected):
+    # "ß" only lowercases to itself, so it never matches "ss" as it can with str.upper()
+    index = NameIndex(pd.Series(["Straße", "STRASSE"], dtype=object))
+    assert index.search(term).tolist() == expected
+
+def test_key_index_matches_a_mask_scan():
+    rng = np.random.default_rng(2)
+    values = rng.integers(0, 500, 20_000)
+    index = KeyIndex(values)
+    for key in [0, 17, 499, 500, -1]:
+        np.testing.assert_array_equal(index.lookup(key), np.flatnonzero(values == key))
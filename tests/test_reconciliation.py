@@ -0,0 +1,99 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from banktech.reconciliation import (MATCHED, RESULT_COLUMNS, UNMATCHED, ScratchFile, read_results, reconcile,
+                                     reconcile_chunked, reconcile_parallel, reconciliation_status)
+
+def make_ledgers(rows=20_000, seed=7):
+    rng = np.random.default_rng(seed)
+    transaction_ids = rng.permutation(rows * 2)[:rows]
+    # Sums of cents are not exactly representable, e.g. 0.1 + 0.2
+    amounts = rng.integers(1, 10_000_000, rows) / 100 + rng.integers(1, 100, rows) / 100
+    bank = pd.DataFrame({'Transaction_ID': transaction_ids, 'Transactions_Amount': amounts})
+
+    customer_amounts = amounts.copy()
+    customer_amounts[rng.random(rows) < 0.05] += 1
+    missing = rng.random(rows) < 0.05
+    customer = pd.DataFrame({'Transaction_ID': transaction_ids[~missing],
+                             'Transaction_Amount': customer_amounts[~missing]})
+    return bank, customer.sample(frac=1, random_state=seed)
+
+def to_csv_buffer(df):
+    return io.BytesIO(df.to_csv(index=False).encode())
+
+def test_chunked_matches_in_memory(tmp_path):
+    bank, customer = make_ledgers()
+    expected = reconcile(bank, customer)
+
+    output_path = tmp_path / "result.csv"
+    status_counts = reconcile_chunked(to_csv_buffer(bank), to_csv_buffer(customer), output_path,
+                                      n_buckets=8, chunksize=3_000, work_dir=tmp_path)
+    result = read_results(output_path, limit=len(expected) + 1)
+
+    # Streamed results keep IDs as nullable integers
+    expected['Transaction_ID'] = expected['Transaction_ID'].astype('Int64')
+    pd.testing.assert_frame_equal(result[RESULT_COLUMNS], expected[RESULT_COLUMNS], check_exact=True)
+    assert status_counts.to_dict() == expected['Reconciliation_Status'].value_counts().to_dict()
+
+def test_chunked_matches_in_memory_with_blank_ids(tmp_path):
+    bank, customer = make_ledgers(rows=2_000)
+    bank = bank.astype({'Transaction_ID': 'float64'})
+    customer = customer.astype({'Transaction_ID': 'float64'})
+    bank.iloc[[5, 900], 0] = np.nan
+    customer.iloc[[10], 0] = np.nan
+    bank_csv, customer_csv = to_csv_buffer(bank), to_csv_buffer(customer)
+    # As the app sees them: read back, a blank ID makes the column float64
+    expected = reconcile(pd.read_csv(bank_csv, float_precision="round_trip"),
+                         pd.read_csv(customer_csv, float_precision="round_trip"))
+
+    output_path = tmp_path / "result.csv"
+    status_counts = reconcile_chunked(bank_csv, customer_csv, output_path, n_buckets=8, chunksize=300,
+                                      work_dir=tmp_path)
+    result = read_results(output_path, limit=len(expected) + 1)
+
+    assert result['Transaction_ID'].isna().sum() == 2
+    expected['Transaction_ID'] = expected['Transaction_ID'].astype('Int64')
+    pd.testing.assert_frame_equal(result[RESULT_COLUMNS], expected[RESULT_COLUMNS], check_exact=True)
+    assert status_counts.to_dict() == expected['Reconciliation_Status'].value_counts().to_dict()
+
+def test_spooled_upload_streams_like_the_upload(tmp_path):
+    bank, customer = make_ledgers(rows=2_000)
+    bank_csv = to_csv_buffer(bank)
+    bank_csv.read(100)
+    spooled = ScratchFile.spool(bank_csv, tmp_path)
+    assert open(spooled.path, "rb").read() == bank_csv.getvalue()
+
+    expected = reconcile_chunked(bank_csv, to_csv_buffer(customer), tmp_path / "expected.csv", work_dir=tmp_path)
+    status_counts = reconcile_chunked(spooled.path, to_csv_buffer(customer), tmp_path / "result.csv",
+                                      work_dir=tmp_path)
+    assert status_counts.to_dict() == expected.to_dict()
+
+    spooled.release()
+    assert not os.path.exists(spooled.path)
+
+def test_default_tolerance_flags_every_paisa():
+    bank = [2e7, 5e7, 1e12 + 0.01, 0.1 + 0.2, 100.0, np.nan]
+    customer = [2e7 + 0.01, 5e7 + 0.05, 1e12, 0.3, 100.0, 100.0]
+    assert list(reconciliation_status(bank, customer)) == [UNMATCHED, UNMATCHED, UNMATCHED, MATCHED, MATCHED, UNMATCHED]
+
+def test_parallel_matches_in_memory():
+    bank, customer = make_ledgers()
+    merged, status_counts = reconcile_parallel(bank, customer, workers=3)
+    expected = reconcile(bank, customer)
+
+    pd.testing.assert_frame_equal(merged, expected, check_exact=True)
+    assert status_counts.to_dict() == expected['Reconciliation_Status'].value_counts().to_dict()
+
+def test_parallel_matches_in_memory_with_mixed_id_dtypes():
+    bank = pd.DataFrame({'Transaction_ID': np.arange(1, 9), 'Transactions_Amount': np.arange(1.0, 9.0)})
+    # A blank Transaction_ID makes the customer IDs float64
+    customer = pd.DataFrame({'Transaction_ID': [1.0, 2.0, 3.0, 4.0, 6.0, 8.0, np.nan],
+                             'Transaction_Amount': [1.0, 2.0, 3.0, 4.5, 6.0, 8.0, 9.0]})
+    merged, status_counts = reconcile_parallel(bank, customer, workers=3)
+    expected = reconcile(bank, customer)
+
+    pd.testing.assert_frame_equal(merged, expected, check_exact=True)
+    assert status_counts[MATCHED] == 5
@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+
+import pytest
+
+from banktech import reports
+from banktech.reports import ReportCache, StubModel, get_model, start_report
+
+STATS = {
+    'total_transactions': 24,
+    'total_amount': 1245300.0,
+    'avg_amount': 51887.5,
+    'max_transaction': 198400.0,
+    'credit_count': 15,
+    'credit_sum': 543150.0,
+    'debit_count': 9,
+    'debit_sum': 702150.0,
+    'net_balance': -159000.0,
+    'locations': "Mumbai, Pune",
+}
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reports.time, "time", clock)
+    return clock
+
+def accessed_at(cache, key):
+    with sqlite3.connect(cache.path) as connection:
+        return connection.execute("SELECT accessed_at FROM reports WHERE key = ?", (key,)).fetchone()[0]
+
+class CountingModel(StubModel):
+    """Stub model that counts its calls and can hold them until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def stream(self, prompt):
+        self.calls += 1
+        self.release.wait()
+        yield from super().stream(prompt)
+
+class FailingModel(StubModel):
+    def stream(self, prompt):
+        raise RuntimeError("quota exceeded")
+        yield
+
+def test_cache_hit_and_miss(tmp_path, clock):
+    cache = ReportCache(tmp_path / "reports.sqlite", ttl=3600)
+    assert cache.get("a") is None
+
+    cache.put("a", "C1", "report a")
+    assert cache.get("a") == "report a"
+    assert cache.get("b") is None
+
+    clock.now += 3601
+    assert cache.get("a") is None
+
+def test_cache_hit_records_access_at_most_once_per_interval(tmp_path, clock):
+    cache = ReportCache(tmp_path / "reports.sqlite", access_interval=60)
+    cache.put("a", "C1", "report a")
+    written = clock.now
+
+    clock.now += 30
+    assert cache.get("a") == "report a"
+    assert accessed_at(cache, "a") == written
+
+    clock.now += 30
+    assert cache.get("a") == "report a"
+    assert accessed_at(cache, "a") == clock.now
+
+def test_cache_evicts_least_recently_read(tmp_path, clock):
+    cache = ReportCache(tmp_path / "reports.sqlite", max_entries=2, access_interval=60)
+    cache.put("a", "C1", "report a")
+    clock.now += 1
+    cache.put("b", "C2", "report b")
+    clock.now += 60
+    cache.get("a")
+    cache.put("c", "C3", "report c")
+
+    assert cache.get("a") == "report a"
+    assert cache.get("b") is None
+    assert cache.get("c") == "report c"
+
+def test_stub_model_is_used_when_configured(monkeypatch):
+    monkeypatch.setattr(reports, "REPORT_MODEL", "stub")
+    monkeypatch.setattr(reports, "_model", None)
+    assert isinstance(get_model(), StubModel)
+
+def test_stub_report_is_generated_once_and_then_cached(tmp_path):
+    cache = ReportCache(tmp_path / "reports.sqlite")
+    model = CountingModel()
+
+    report = start_report(STATS, "Aarav Sharma", "C1", model=model, cache=cache).result()
+    assert report.startswith("## Banking Analysis Report for Aarav Sharma")
+    assert "- Net Balance: ₹-159000" in report
+
+    cached = start_report(STATS, "Aarav Sharma", "C1", model=model, cache=cache)
+    assert cached.done
+    assert cached.result() == report
+    assert model.calls == 1
+
+def test_concurrent_requests_share_one_model_call(tmp_path):
+    cache = ReportCache(tmp_path / "reports.sqlite")
+    model = CountingModel()
+    model.release.clear()
+
+    first = start_report(STATS, "Aarav Sharma", "C1", model=model, cache=cache)
+    second = start_report(STATS, "Aarav Sharma", "C1", model=model, cache=cache)
+    assert second is first
+    model.release.set()
+
+    assert first.result() == second.result()
+    assert model.calls == 1
+
+def test_failed_reports_are_not_cached(tmp_path):
+    cache = ReportCache(tmp_path / "reports.sqlite")
+
+    job = start_report(STATS, "Aarav Sharma", "C1", model=FailingModel(), cache=cache)
+    assert job.result() == "AI report generation failed: quota exceeded"
+    assert job.failed
+    assert cache.get(job.key) is None
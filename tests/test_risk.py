@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from banktech.risk import calculate_risk_score, get_credit_score_category, get_risk_category, score_customers
+
+def make_customers(rows=200_000, seed=3):
+    """Customers with values on and just beside every band boundary, and missing values"""
+    rng = np.random.default_rng(seed)
+    credit_scores = np.array([300, 599, 600, 649, 650, 699, 700, 749, 750, 850, np.nan])
+    incomes = np.array([0, 29999.99, 30000, 49999.99, 50000, 74999.99, 75000, 99999.99, 100000, 1e7, np.nan])
+    utilizations = np.array([0, 0.1, np.nextafter(0.1, 1), 0.3, 0.30000000000000004, 0.5, 0.5000001,
+                             0.7, 0.70001, 1.0, np.nan])
+    return pd.DataFrame({
+        'Credit_Score': np.where(rng.random(rows) < 0.5, rng.choice(credit_scores, rows),
+                                 rng.integers(300, 851, rows)),
+        'Income': np.where(rng.random(rows) < 0.5, rng.choice(incomes, rows),
+                           rng.uniform(0, 200_000, rows).round(2)),
+        'Credit_Utilization': np.where(rng.random(rows) < 0.5, rng.choice(utilizations, rows), rng.random(rows)),
+        'Default_History': rng.choice(np.array(['Yes', 'No', None], dtype=object), rows),
+    })
+
+def test_batch_scores_match_scalar_functions():
+    customers = make_customers()
+    scores = score_customers(customers)
+
+    expected_scores = []
+    expected_risk = []
+    expected_credit = []
+    expected_loans = []
+    for customer in customers.to_dict('records'):
+        score = calculate_risk_score(customer)
+        expected_scores.append(score)
+        expected_risk.append(get_risk_category(score)[0])
+        expected_credit.append(get_credit_score_category(customer['Credit_Score'])[0])
+        # The page rounds the loan for customers with an income; round(nan) raises
+        income = customer['Income']
+        expected_loans.append(round((score / 100) * income * 3) if not math.isnan(income) else np.nan)
+
+    assert scores['Risk_Score'].tolist() == expected_scores
+    assert scores['Default_Probability'].tolist() == [100 - score for score in expected_scores]
+    assert scores['Risk_Category'].tolist() == expected_risk
+    assert scores['Credit_Score_Category'].tolist() == expected_credit
+    np.testing.assert_array_equal(scores['Max_Loan'].to_numpy(dtype=float), np.array(expected_loans, dtype=float))
+
+def test_batch_scores_keep_the_index():
+    customers = make_customers(rows=10).set_index(pd.Index(range(100, 110)))
+    assert score_customers(customers).index.equals(customers.index)
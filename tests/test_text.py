@@ -0,0 +1,94 @@
+import random
+import re
+
+import pytest
+
+from banktech.text import normalize_report
+
+def legacy_normalize(report):
+    """The original post-processing that normalize_report must reproduce exactly"""
+    report = re.sub(r'(\d+)([a-zA-Z])', r'\1 \2', report)
+    patterns = [
+        (r'over\s*the\s*analyzed\s*period', 'over the analyzed period'),
+        (r'The\s*average', 'The average'),
+        (r'compared\s*to', 'compared to'),
+        (r'resulting\s*in', 'resulting in'),
+        (r'indicates\s*a', 'indicates a'),
+        (r'with\s*an', 'with an'),
+        (r'of\s*₹', 'of ₹'),
+        (r'balance\s*of', 'balance of')
+    ]
+    for pattern, replacement in patterns:
+        report = re.sub(pattern, replacement, report, flags=re.IGNORECASE)
+    return report
+
+WORDS = ["over", "the", "analyzed", "period", "The", "AVERAGE", "compared", "to", "resulting", "in",
+         "indicates", "a", "with", "an", "of", "₹", "balance", "transactions", "credit", "Debit",
+         "5", "12,500", "₹4,200", "3credit", "24x", "\n", "\t", "## Summary:", "customer"]
+
+def make_word_soup(rng, words=600):
+    """Phrase fragments run together at random, including overlapping phrases"""
+    return "".join(rng.choice(WORDS) + rng.choice(["", " ", " ", "  ", "\n"]) for _ in range(words))
+
+# Report text as the model returns it, with the spacing slips it makes
+REPORTS = [
+    """## Banking Analysis Report for Aarav Sharma
+
+#### 1. Summary:
+Aarav Sharma made 24transactions overtheanalyzedperiod totaling ₹1,245,300. Theaverage transaction amount is ₹51,887, with amaximum of₹198,400.
+
+#### 2. Spending Habits & Financial Behavior:
+There were 9debit transactions totaling ₹702,150 comparedto 15credit transactions of ₹543,150, resultingin a net balanceof₹-159,000. This indicatesa reliance on savings.
+
+#### 3. Loan Recommendations:
+With an average of ₹51,887 per transaction, a personal loan of₹2,00,000 is affordable.
+
+#### 4. Notable Patterns:
+Transactions are spread across 3locations: Mumbai, Pune and Nashik.
+""",
+    """## Banking Analysis Report for Diya Iyer
+
+#### 1. Summary:
+Diya Iyer made 1 transaction over the analyzed period, withan amount of ₹12,000.
+
+#### 2. Spending Habits & Financial Behavior:
+THE AVERAGE transaction is ₹12,000, compared to 0debit transactions, resulting in a balance of ₹12,000.
+
+#### 3. Loan Recommendations:
+Insufficient history; this indicates a new account.
+
+#### 4. Notable Patterns:
+No patterns over the analyzed period.
+""",
+]
+
+@pytest.mark.parametrize("report", REPORTS)
+def test_matches_legacy_on_reports(report):
+    assert normalize_report(report) == legacy_normalize(report)
+
+def test_matches_legacy_on_word_soup():
+    rng = random.Random(42)
+    for _ in range(500):
+        text = make_word_soup(rng)
+        assert normalize_report(text) == legacy_normalize(text)
+
+@pytest.mark.parametrize("text, expected", [
+    ("24transactions", "24 transactions"),
+    ("overtheanalyzedperiod", "over the analyzed period"),
+    ("THEAVERAGE", "The average"),
+    ("balanceof₹500", "balance of ₹500"),
+    ("balance  of", "balance of"),
+    ("comparedto 3credit", "compared to 3 credit"),
+])
+def test_fixes(text, expected):
+    assert normalize_report(text) == expected
+
+@pytest.mark.parametrize("text", [
+    "resultingindicatesa",
+    "resulting  indicates  an",
+    "balanceof₹500",
+    "123abc4D",
+    "٣credit",
+])
+def test_matches_legacy_on_overlapping_phrases(text):
+    assert normalize_report(text) == legacy_normalize(text)
@@ -0,0 +1,38 @@
+import io
+import os
+
+from banktech.ingest import read_csv_typed
+from banktech.validation import ERROR, validate_salary
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def test_sample_file_ifsc_codes_are_flagged():
+    # The sample's IFSC codes have only nine characters and no reserved zero
+    df = read_csv_typed(os.path.join(DATA_DIR, "sample_salary_data.csv"), schema="salary")
+    result = validate_salary(df)
+
+    assert not result.valid
+    assert result.errors.all()
+    ifsc_issues = result.report[result.report["Column"] == "IFSC Code"]
+    assert len(ifsc_issues) == len(df)
+    assert (ifsc_issues["Severity"] == ERROR).all()
+
+def test_valid_sample_file_passes():
+    df = read_csv_typed(os.path.join(DATA_DIR, "sample_salary_data_valid.csv"), schema="salary")
+    result = validate_salary(df)
+
+    assert result.valid
+    assert (result.report["Severity"] != ERROR).all()
+
+def test_report_counts_data_rows_not_file_lines():
+    # The second employee's name spans two lines, and a blank line follows it
+    source = io.StringIO(
+        "Employee ID,Employee Name,Bank Account Number,IFSC Code,Salary Amount (INR)\n"
+        "E1,Asha Rao,123456789012,SBIN0001234,50000\n"
+        "E2,\"Ravi\nKumar\",123456789013,SBIN0001234,50000\n"
+        "\n"
+        "E3,Meera Iyer,123456789014,BAD,50000\n"
+    )
+    result = validate_salary(read_csv_typed(source, schema="salary"))
+
+    assert result.report[["Row", "Employee ID"]].values.tolist() == [[3, "E3"]]